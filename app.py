@@ -1,8 +1,11 @@
+import os
 import streamlit as st
 import pandas as pd
 import urllib.parse
 import numpy as np
 
+from pipeline_logic import ingest
+from pipeline_logic.pitcher_log import PitcherLogIndex
 
 st.set_page_config(page_title="MLB All Stats Predictor", layout="wide")
 params = st.query_params
@@ -21,6 +24,17 @@ def load_predictions():
 
 pred_df, hist_df = load_predictions()
 
+# Keyed on the master's size and mtime, so the index is rebuilt after each scrape
+@st.cache_resource(max_entries=1)
+def _pitcher_log_index(master_version):
+    log_df = ingest.load("pitcher_games")
+    log_df.insert(log_df.columns.get_loc("IP_outs"), "IP", ingest.ip_notation(log_df["IP_outs"]))
+    return PitcherLogIndex(log_df.drop(columns="IP_outs"), key="Player_key")
+
+def load_pitcher_logs():
+    stat = os.stat(ingest.SCHEMAS["pitcher_games"]["master"])
+    return _pitcher_log_index((stat.st_size, stat.st_mtime_ns))
+
 # === Shared Helpers ===
 def get_confidence(pred, line):
     level = min(int(abs(pred - line) / 0.5), 5)
@@ -221,11 +235,7 @@ elif st.session_state.active_tab == 3:
 
     try:
         team_df = pd.read_csv("outputs/team_predictions.csv")
-        pitcher_df = pd.read_csv("data/Stathead_2025_Pitcher_Master.csv")
-
         team_df["date"] = pd.to_datetime(team_df["date"]).dt.date
-        pitcher_df["Date"] = pitcher_df["Date"].astype(str).str.extract(r"^(\d{4}-\d{2}-\d{2})")[0]
-        pitcher_df["Date"] = pd.to_datetime(pitcher_df["Date"], errors="coerce")
 
         # === Read query params
         params = st.query_params
@@ -253,15 +263,11 @@ elif st.session_state.active_tab == 3:
             st.markdown(f"##  Game Log for {selected_name}")
 
             try:
-                pitcher_log_df = pd.read_csv("data/Stathead_2025_Pitcher_Master.csv")
-                pitcher_log_df["Date"] = pitcher_log_df["Date"].astype(str).str.extract(r"^(\d{4}-\d{2}-\d{2})")[0]
-                pitcher_log_df["Date"] = pd.to_datetime(pitcher_log_df["Date"], errors="coerce")
-
-                filtered_log = pitcher_log_df[pitcher_log_df["Player"] == selected_name]
+                filtered_log = load_pitcher_logs().log(ingest.player_key(selected_name)).drop(columns="Player_key")
                 if filtered_log.empty:
                     st.info("No games found for this pitcher.")
                 else:
-                    st.dataframe(filtered_log.sort_values("Date", ascending=False), use_container_width=True)
+                    st.dataframe(filtered_log.iloc[::-1], use_container_width=True)
 
                 if st.button(" Clear pitcher view"):
                     del st.session_state.selected_pitcher
@@ -0,0 +1,184 @@
+import os
+import sys
+import glob
+import json
+import shutil
+import hashlib
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from joblib import Parallel, delayed
+from sklearn.base import clone
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pipeline_logic import feature_store
+from models import model_selection
+
+BACKTEST_DIR = "data/index/backtest"
+REPORT_DIR = "models/backtests"
+K_FEATURES = ["K_last3", "IP_last3", "ER_last3", "BB_last3", "BF_last3", "Home"]
+
+
+# === Datasets (one row per prediction, with its game date)
+def team_runs():
+    # The training dataset; its rolling columns include the row's own game
+    return pd.read_csv("data/team_run_prediction_dataset.csv", parse_dates=["Date"], float_precision="round_trip")
+
+
+def team_runs_asof():
+    """Every team-game with runs-model inputs as of the day before, as predict_runs sees them."""
+    starters = feature_store.load("starters")[["Game_ID", "Team", "Player_key"]]
+    sides = feature_store.load("team_batting")[["Game_ID", "Date", "Team", "Opp", "Home", "Runs"]]
+    sides = sides.merge(starters.rename(columns={"Player_key": "SP_key"}), on=["Game_ID", "Team"], how="left")
+    sides = sides.merge(starters.rename(columns={"Team": "Opp", "Player_key": "Opp_SP_key"}), on=["Game_ID", "Opp"], how="left")
+    out = feature_store.matchup_matrix(sides, feature_store.sp_forms("starters", full_window=True))
+    return out[out["Found"]].rename(columns={"Runs": "Target_Runs"})
+
+
+def pitcher_ks_asof():
+    """Every start with the pitcher's form from their last appearance before that day, as predict_pitcher_ks sees it."""
+    # Strikeout picks are made for starters, so folds hold starts only
+    starts = feature_store.load("starters")[["Date", "Player_key", "Team", "Opp", "Home", "SO"]]
+    form = [c for c in K_FEATURES if c != "Home"]
+    history = feature_store.load("pitcher_games")[["Player_key", "Date", "N_3g"] + form]
+    out = feature_store.asof_join(starts, history, "Player_key", "Player_key", ["N_3g"] + form, "Found")
+    return out[out["Found"] & (out["N_3g"] >= feature_store.WINDOW)]
+
+
+# name → (point-in-time loader, features, target, model backtested by default, pick lines).
+# Folds never use a window that contains the game being predicted.
+TARGETS = {
+    "team_runs": (team_runs_asof, feature_store.RUNS_FEATURES, "Target_Runs", "models/final_team_model.joblib", [3.5, 4.5, 5.5, 6.5]),
+    "pitcher_ks": (pitcher_ks_asof, K_FEATURES, "SO", "models/pitcher_k_model.joblib", [3.5, 4.5, 5.5, 6.5]),
+}
+
+
+# === Folds
+def walk_forward(dates, min_train_days, step_days):
+    """``(start, end)`` of each fold: train on every game before ``start``, test on ``[start, end)``."""
+    start = dates.min() + pd.Timedelta(days=min_train_days)
+    folds = []
+    while start <= dates.max():
+        end = start + pd.Timedelta(days=step_days)
+        if ((dates >= start) & (dates < end)).any():
+            folds.append((start, end))
+        start = end
+    return folds
+
+
+def _dataset_hash(frame):
+    return hashlib.sha256(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def fold_matrices(name, min_train_days, step_days):
+    """Every fold's train/test matrices as memory-mappable ``.npy`` files, built once per dataset.
+
+    Folds are cached under data/index/backtest/<name>-<dataset hash>/, one
+    subdirectory per fold setting, so repeated backtests of an unchanged
+    dataset skip building them. Caches of older datasets are dropped;
+    other settings of the current one (e.g. tuning's folds) are kept.
+    """
+    load, features, target, _, _ = TARGETS[name]
+    frame = load()
+    frame = frame.dropna(subset=features + [target])[["Date"] + features + [target]]
+    frame = frame.sort_values("Date", kind="stable").reset_index(drop=True)
+    dataset = _dataset_hash(frame)
+    key = hashlib.sha256(f"{dataset}|{min_train_days}|{step_days}".encode()).hexdigest()[:16]
+    dataset_dir = os.path.join(BACKTEST_DIR, f"{name}-{dataset[:16]}")
+    directory = os.path.join(dataset_dir, f"train{min_train_days}-step{step_days}")
+    index_path = os.path.join(directory, "folds.json")
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            return json.load(f), True
+
+    for old in glob.glob(os.path.join(BACKTEST_DIR, f"{name}-*")):
+        if old != dataset_dir:
+            shutil.rmtree(old)
+    folds = []
+    for i, (start, end) in enumerate(walk_forward(frame["Date"], min_train_days, step_days)):
+        train = frame[frame["Date"] < start]
+        test = frame[(frame["Date"] >= start) & (frame["Date"] < end)]
+        fold_dir = os.path.join(directory, f"fold_{i:02d}")
+        os.makedirs(fold_dir, exist_ok=True)
+        paths = model_selection.share({
+            "X_train": train[features], "y_train": train[target], "X_test": test[features], "y_test": test[target],
+        }, fold_dir)
+        folds.append({
+            "fold": i, "key": key, "start": start.date().isoformat(), "end": end.date().isoformat(),
+            "train_rows": len(train), "test_rows": len(test), "paths": paths,
+        })
+    # Written last: a cache without its index is rebuilt
+    os.makedirs(directory, exist_ok=True)
+    with open(index_path, "w") as f:
+        json.dump(folds, f, indent=2)
+    return folds, False
+
+
+# === Scoring
+def _score_fold(model, paths, features):
+    data = model_selection.open_shared(paths, features)
+    model.fit(data["X_train"], data["y_train"])
+    return model.predict(data["X_test"])
+
+
+def _metrics(actual, predicted, lines):
+    row = {
+        "rmse": round(float(np.sqrt(np.mean((actual - predicted) ** 2))), 4),
+        "mae": round(float(np.mean(np.abs(actual - predicted))), 4),
+    }
+    for line in lines:
+        # A pick is the side of the line the prediction falls on, as in the app
+        row[f"hit_{line}"] = round(float(np.mean((predicted > line) == (actual > line))), 4)
+    return row
+
+
+def backtest(name, model, min_train_days=21, step_days=7, workers=-1):
+    """Walk-forward backtest of ``model`` (refit from scratch on each fold) for target ``name``."""
+    _, features, _, _, lines = TARGETS[name]
+    folds, cached = fold_matrices(name, min_train_days, step_days)
+    print(f" {len(folds)} fold(s) {'from cache' if cached else 'built'}")
+
+    predictions = Parallel(n_jobs=workers)(
+        delayed(_score_fold)(clone(model), fold["paths"], features) for fold in folds
+    )
+    rows, actual_all = [], []
+    for fold, predicted in zip(folds, predictions):
+        actual = np.load(fold["paths"]["y_test"])
+        actual_all.append(actual)
+        rows.append({k: fold[k] for k in ["fold", "start", "end", "train_rows", "test_rows"]} | _metrics(actual, predicted, lines))
+    overall = _metrics(np.concatenate(actual_all), np.concatenate(predictions), lines) if folds else {}
+    return rows, overall
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Walk-forward backtest: train on the past, predict the next days.")
+    arg_parser.add_argument("target", choices=list(TARGETS))
+    arg_parser.add_argument("--model", help="saved model whose estimator is refit per fold (default: the production model)")
+    arg_parser.add_argument("--min-train-days", type=int, default=21, help="days of games before the first test fold")
+    arg_parser.add_argument("--step-days", type=int, default=7, help="days of games in each test fold")
+    arg_parser.add_argument("--workers", type=int, default=-1, help="folds fitted at once (-1: every core)")
+    args = arg_parser.parse_args()
+
+    model_path = args.model or TARGETS[args.target][3]
+    rows, overall = backtest(args.target, joblib.load(model_path), args.min_train_days, args.step_days, args.workers)
+
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False) if len(report) else " No fold has test games yet")
+    print(" Overall:", ", ".join(f"{k} {v}" for k, v in overall.items()))
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = os.path.join(REPORT_DIR, f"{args.target}.json")
+    with open(path, "w") as f:
+        json.dump({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "model": model_path,
+            "min_train_days": args.min_train_days,
+            "step_days": args.step_days,
+            "features": "as of the day before each game",
+            "folds": rows,
+            "overall": overall,
+        }, f, indent=2)
+    print(f" Backtest saved to {path}")
@@ -0,0 +1,161 @@
+import os
+import sys
+import glob
+import json
+import shutil
+import argparse
+import joblib
+import numpy as np
+from pathlib import Path
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor, GradientBoostingRegressor
+from sklearn.linear_model import LinearRegression
+from xgboost import XGBRegressor
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pipeline_logic import flat_trees
+
+
+# === Flattening (one dict of node arrays per tree; leaves point back at themselves)
+def _depth(left, right):
+    depth, level = 0, [0]
+    while True:
+        level = [child for node in level for child in (left[node], right[node]) if child != node]
+        if not level:
+            return depth
+        depth += 1
+
+
+def _sklearn_tree(estimator, proba=False, scale=1.0):
+    tree = estimator.tree_
+    nodes = np.arange(tree.node_count)
+    leaf = tree.children_left < 0
+    value = tree.value[:, 0, :]
+    if proba:
+        # Class probabilities per node, normalized as DecisionTreeClassifier.predict_proba does
+        normalizer = value.sum(axis=1)[:, None]
+        normalizer[normalizer == 0.0] = 1.0
+        value = value / normalizer
+    else:
+        value = value[:, 0] * scale
+    missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8))
+    return {
+        "feature": np.where(leaf, 0, tree.feature),
+        "threshold": tree.threshold,
+        "left": np.where(leaf, nodes, tree.children_left),
+        "right": np.where(leaf, nodes, tree.children_right),
+        "default_left": np.asarray(missing_left, dtype=bool),
+        "value": value,
+    }
+
+
+def _xgboost_trees(booster):
+    model = json.loads(booster.save_raw(raw_format="json"))["learner"]
+    if model["gradient_booster"]["name"] != "gbtree":
+        raise ValueError(f"booster {model['gradient_booster']['name']} is not supported")
+    trees = []
+    for tree in model["gradient_booster"]["model"]["trees"]:
+        left = np.array(tree["left_children"])
+        nodes = np.arange(len(left))
+        leaf = left < 0
+        conditions = np.array(tree["split_conditions"], dtype=np.float32)
+        trees.append({
+            "feature": np.where(leaf, 0, tree["split_indices"]),
+            # XGBoost sends x < split left, comparing in float32
+            "threshold": conditions,
+            "left": np.where(leaf, nodes, left),
+            "right": np.where(leaf, nodes, tree["right_children"]),
+            "default_left": np.array(tree["default_left"], dtype=bool),
+            # A leaf keeps its weight where a split keeps its condition
+            "value": np.where(leaf, conditions, np.float32(0.0)),
+        })
+    return trees, float(str(model["learner_model_param"]["base_score"]).strip("[]"))
+
+
+def _stack(trees):
+    """Every tree's nodes back to back, with child indices shifted to the combined arrays."""
+    sizes = [len(tree["left"]) for tree in trees]
+    roots = np.r_[0, np.cumsum(sizes)[:-1]].astype(np.int64)
+    arrays = {"roots": roots}
+    for name in flat_trees.NODE_ARRAYS:
+        parts = [tree[name] + root if name in ("left", "right") else tree[name] for tree, root in zip(trees, roots)]
+        arrays[name] = np.ascontiguousarray(np.concatenate(parts))
+    arrays["feature"] = arrays["feature"].astype(np.int64)
+    return arrays, max(_depth(tree["left"], tree["right"]) for tree in trees)
+
+
+def flatten(model):
+    """``(arrays, meta)`` of ``model``'s compiled form; ``ValueError`` for an estimator it cannot compile."""
+    meta = {"kind": "trees", "classes": None, "base": 0.0, "average": False, "comparison": "<="}
+    if isinstance(model, RandomForestClassifier):
+        if model.n_outputs_ != 1:
+            raise ValueError("multi-output forests are not supported")
+        trees = [_sklearn_tree(e, proba=True) for e in model.estimators_]
+        meta.update(classes=model.classes_.tolist(), average=True)
+    elif isinstance(model, RandomForestRegressor):
+        trees = [_sklearn_tree(e) for e in model.estimators_]
+        meta.update(average=True)
+    elif isinstance(model, GradientBoostingRegressor):
+        if model.init_ == "zero":
+            base = 0.0
+        elif hasattr(model.init_, "constant_"):
+            base = float(np.ravel(model.init_.constant_)[0])
+        else:
+            raise ValueError(f"init estimator {type(model.init_).__name__} is not supported")
+        trees = [_sklearn_tree(e, scale=model.learning_rate) for e in model.estimators_[:, 0]]
+        meta.update(base=base)
+    elif isinstance(model, XGBRegressor):
+        if model.get_params()["objective"] != "reg:squarederror":
+            raise ValueError(f"objective {model.get_params()['objective']} is not supported")
+        trees, base = _xgboost_trees(model.get_booster())
+        meta.update(base=base, comparison="<")
+    elif isinstance(model, LinearRegression):
+        return {"coef": np.ascontiguousarray(np.ravel(model.coef_), dtype=np.float64)}, {
+            "kind": "linear", "classes": None, "base": float(np.ravel(model.intercept_)[0]),
+            "features": list(model.feature_names_in_),
+        }
+    else:
+        raise ValueError(f"{type(model).__name__} is not supported")
+
+    arrays, depth = _stack(trees)
+    features = model.get_booster().feature_names if isinstance(model, XGBRegressor) else model.feature_names_in_
+    meta.update(features=list(features), depth=depth, trees=len(trees), nodes=len(arrays["left"]))
+    return arrays, meta
+
+
+def compile_model(path):
+    """Write the compiled export of the model saved at ``path`` to models/compiled/<name>/."""
+    arrays, meta = flatten(joblib.load(path))
+    meta["source"] = flat_trees.signature(path)
+    directory = flat_trees.compiled_dir(path)
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
+    for name, values in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), values)
+    # Written last: an export without its meta.json is never loaded
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compile saved models to flat arrays for fast, library-free scoring.")
+    arg_parser.add_argument("paths", nargs="*", help="saved models to compile (default: every models/*.joblib)")
+    args = arg_parser.parse_args()
+
+    for path in args.paths or sorted(glob.glob("models/*.joblib")):
+        compiled = flat_trees.compiled_dir(path)
+        if os.path.exists(os.path.join(compiled, "meta.json")):
+            with open(os.path.join(compiled, "meta.json")) as f:
+                if json.load(f)["source"] == flat_trees.signature(path):
+                    print(f" {path}: compiled export is current")
+                    continue
+        try:
+            meta = compile_model(path)
+        except Exception as e:
+            # Predict steps keep unpickling a model that cannot be compiled
+            print(f" {path}: not compiled ({e})")
+            continue
+        size = sum(os.path.getsize(p) for p in glob.glob(os.path.join(compiled, "*.npy")))
+        detail = "linear" if meta["kind"] == "linear" else f"{meta['trees']} trees, {meta['nodes']} nodes, depth {meta['depth']}"
+        print(f" {path}: compiled to {compiled} ({detail}, {size / 1e6:.2f} MB)")
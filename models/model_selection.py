@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, wait
+from joblib.externals.loky import ProcessPoolExecutor
+
+LEADERBOARD_DIR = "models/leaderboards"
+# Seconds each candidate may spend fitting before it is dropped
+CANDIDATE_BUDGET = 600
+
+
+# === Shared matrices
+def share(arrays, directory):
+    """Write each array once as ``.npy``; workers memory-map the files instead of receiving copies."""
+    paths = {}
+    for name, values in arrays.items():
+        paths[name] = os.path.join(directory, f"{name}.npy")
+        np.save(paths[name], np.ascontiguousarray(values, dtype=np.float64))
+    return paths
+
+
+def open_shared(paths, features):
+    """Memory-mapped arrays written by ``share``; the X matrices come back as DataFrames."""
+    data = {name: np.load(path, mmap_mode="r") for name, path in paths.items()}
+    for name in ["X_train", "X_test"]:
+        # Named columns so the saved model predicts on DataFrames without warnings
+        data[name] = pd.DataFrame(data[name], columns=features, copy=False)
+    return data
+
+
+# === Worker
+def _fit_candidate(model, paths, features, threads):
+    data = open_shared(paths, features)
+    capped = "n_jobs" in model.get_params() and model.get_params()["n_jobs"] is None
+    if capped:
+        model.set_params(n_jobs=threads)
+    start = time.perf_counter()
+    model.fit(data["X_train"], data["y_train"])
+    fit_seconds = time.perf_counter() - start
+    preds = model.predict(data["X_test"])
+    if capped:
+        # The per-worker cap is for fitting only; the saved model keeps its own setting
+        model.set_params(n_jobs=None)
+    rmse = float(np.sqrt(np.mean((np.asarray(data["y_test"]) - preds) ** 2)))
+    return model, rmse, fit_seconds
+
+
+# === Runner
+def run(label, candidates, X_train, y_train, X_test, y_test, budget=CANDIDATE_BUDGET):
+    """Fit every candidate at once (one process each) and score it on the test split.
+
+    The four matrices are written once to a temporary directory and opened
+    memory-mapped by every worker. A candidate still fitting ``budget``
+    seconds after submission is dropped and its worker killed, so the run
+    takes about as long as the slowest candidate that fits the budget.
+    Writes ``models/leaderboards/<label>.json`` and returns ``(leaderboard,
+    fitted)``: rows sorted by RMSE (``name, status, rmse, fit_seconds``;
+    status ``ok``, ``failed`` or ``timeout``) and the fitted models by name.
+    """
+    features = list(X_train.columns)
+    threads = max(1, (os.cpu_count() or 1) // len(candidates))
+    rows, fitted = {}, {}
+    with tempfile.TemporaryDirectory(prefix="model_selection_") as tmp:
+        paths = share({"X_train": X_train, "y_train": y_train, "X_test": X_test, "y_test": y_test}, tmp)
+        executor = ProcessPoolExecutor(max_workers=len(candidates))
+        started = time.perf_counter()
+        pending = {executor.submit(_fit_candidate, model, paths, features, threads): name
+                   for name, model in candidates.items()}
+        while pending:
+            remaining = budget - (time.perf_counter() - started)
+            done, _ = wait(pending, timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+            if not done:
+                for name in pending.values():
+                    rows[name] = {"name": name, "status": "timeout", "rmse": None, "fit_seconds": None}
+                    print(f" {name}: over the {budget}s budget — dropped")
+                break
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    fitted[name], rmse, fit_seconds = future.result()
+                except Exception as e:
+                    rows[name] = {"name": name, "status": "failed", "rmse": None, "fit_seconds": None, "error": str(e)}
+                    print(f" {name} failed: {e}")
+                    continue
+                rows[name] = {"name": name, "status": "ok", "rmse": rmse, "fit_seconds": round(fit_seconds, 3)}
+                print(f" {name}: RMSE = {rmse:.3f} (fit {fit_seconds:.2f}s)")
+        executor.shutdown(wait=not pending, kill_workers=bool(pending))
+
+    leaderboard = sorted(rows.values(), key=lambda r: (r["rmse"] is None, r["rmse"] or 0))
+    if not fitted:
+        raise RuntimeError(f"No {label} candidate finished within {budget}s")
+
+    os.makedirs(LEADERBOARD_DIR, exist_ok=True)
+    path = os.path.join(LEADERBOARD_DIR, f"{label}.json")
+    with open(path, "w") as f:
+        json.dump({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "budget_seconds": budget,
+            "train_rows": len(X_train),
+            "test_rows": len(X_test),
+            "features": features,
+            "wall_seconds": round(time.perf_counter() - started, 3),
+            "leaderboard": leaderboard,
+        }, f, indent=2)
+    print(f" Leaderboard saved to {path}")
+    return leaderboard, fitted
@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import joblib
+import pandas as pd
+from datetime import date
+from pathlib import Path
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from xgboost import XGBRegressor
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pipeline_logic import feature_store
+from models import backtest
+
+STATE_PATH = "models/training_state.json"
+# A model is refit from scratch at least this often, so warm-started trees cannot drift
+FULL_REFIT_DAYS = 7
+# Trees (or boosting rounds) added per warm update, grown on the most recent days of games
+WARM_TREES = 20
+RECENT_DAYS = 14
+
+
+def pitcher_appearances():
+    # Every appearance with three earlier ones, as in train_pitcher_k_model
+    games = feature_store.load("pitcher_games")
+    return games[games["N_3g"] == feature_store.WINDOW]
+
+
+# name → (saved model, dataset loader, features, target)
+MODELS = {
+    "final_team_model": ("models/final_team_model.joblib", backtest.team_runs, feature_store.RUNS_FEATURES, "Target_Runs"),
+    "final_rf_model": ("models/final_rf_model.joblib", backtest.team_runs, feature_store.RUNS_FEATURES, "Target_Runs"),
+    "pitcher_k_model": ("models/pitcher_k_model.joblib", pitcher_appearances, backtest.K_FEATURES, "SO"),
+}
+
+
+# === State
+def _read_state():
+    if not os.path.exists(STATE_PATH):
+        return {}
+    with open(STATE_PATH) as f:
+        return json.load(f)
+
+
+def _signature(path):
+    # Content, not file times: CI checks the repo out fresh, which resets every mtime
+    with open(path, "rb") as f:
+        return {"sha256": hashlib.sha256(f.read()).hexdigest()}
+
+
+# === Fitting
+def warm_update(model, X, y):
+    """Continue ``model`` on the recent rows ``X, y``; ``None`` when it cannot warm start.
+
+    XGBoost continues boosting from the saved booster; RandomForest and
+    GradientBoosting grow ``WARM_TREES`` more trees with ``warm_start``.
+    """
+    if isinstance(model, XGBRegressor):
+        more = clone(model).set_params(n_estimators=WARM_TREES)
+        more.fit(X, y, xgb_model=model.get_booster())
+        # The booster holds every round; the saved params keep the original ensemble size
+        return more.set_params(n_estimators=model.n_estimators)
+    if isinstance(model, (RandomForestRegressor, GradientBoostingRegressor)):
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + WARM_TREES)
+        model.fit(X, y)
+        return model.set_params(warm_start=False)
+    return None
+
+
+def full_refit(model, X, y, base_estimators):
+    """Same hyperparameters fit from scratch on every row, back at the original ensemble size."""
+    fresh = clone(model)
+    if base_estimators is not None:
+        fresh.set_params(n_estimators=base_estimators, warm_start=False)
+    return fresh.fit(X, y)
+
+
+def retrain(name, state, force_full=False):
+    path, load, features, target = MODELS[name]
+    if not os.path.exists(path):
+        print(f" {name}: {path} not found — train it first")
+        return
+    model = joblib.load(path)
+    data = load().dropna(subset=features + [target])
+    if data.empty:
+        print(f" {name}: no training rows yet")
+        return
+    latest = data["Date"].max()
+    entry = state.get(name)
+
+    # A model saved by a training script covers the rows available when it was saved, but
+    # the newest day may have been scraped since: it is folded in on this run to be safe
+    if entry is None or entry.get("model") != _signature(path):
+        entry = {
+            "trained_through": (latest - pd.Timedelta(days=1)).date().isoformat(),
+            "last_full_refit": date.today().isoformat(),
+            "base_estimators": model.get_params().get("n_estimators"),
+        }
+        print(f" {name}: adopted the saved model as trained through {entry['trained_through']}")
+    trained_through = pd.Timestamp(entry["trained_through"])
+    new_rows = data["Date"] > trained_through
+
+    due = (date.today() - date.fromisoformat(entry["last_full_refit"])).days >= FULL_REFIT_DAYS
+    if force_full or (due and new_rows.any()):
+        model = full_refit(model, data[features], data[target], entry["base_estimators"])
+        entry["last_full_refit"] = date.today().isoformat()
+        print(f" {name}: full refit on {len(data)} rows")
+    elif not new_rows.any():
+        print(f" {name}: no new days since {entry['trained_through']}")
+    else:
+        recent = data[data["Date"] > latest - pd.Timedelta(days=RECENT_DAYS)]
+        warmed = warm_update(model, recent[features], recent[target])
+        if warmed is None:
+            # No warm start for this estimator (e.g. LinearRegression); a refit is cheap
+            model = full_refit(model, data[features], data[target], entry["base_estimators"])
+            print(f" {name}: refit on {len(data)} rows ({type(model).__name__} has no warm start)")
+        else:
+            model = warmed
+            print(f" {name}: warm update with {new_rows.sum()} new row(s), {len(recent)} recent row(s)")
+
+    if new_rows.any() or force_full:
+        joblib.dump(model, path)
+    entry["trained_through"] = latest.date().isoformat()
+    entry["model"] = _signature(path)
+    state[name] = entry
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Fold newly played days into the saved models.")
+    arg_parser.add_argument("names", nargs="*", default=list(MODELS), help="models to update (default: all)")
+    arg_parser.add_argument("--full", action="store_true", help="refit from scratch instead of warm starting")
+    args = arg_parser.parse_args()
+
+    state = _read_state()
+    for name in args.names:
+        retrain(name, state, args.full)
+    with open(STATE_PATH, "w") as f:
+        json.dump(state, f, indent=2)
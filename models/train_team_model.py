@@ -1,13 +1,17 @@
+import sys
 import pandas as pd
 import numpy as np
+from pathlib import Path
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from xgboost import XGBRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error
 import joblib
 import os
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from models import model_selection
+
 # === Load dataset ===
 df = pd.read_csv("data/team_run_prediction_dataset.csv")
 
@@ -33,19 +37,12 @@ models = {
     "XGBoost": XGBRegressor(n_estimators=100, learning_rate=0.1, max_depth=4, random_state=42)
 }
 
-rmse_results = {}
-
-print("\n Training models and evaluating on TEST set...")
-for name, model in models.items():
-    model.fit(X_train, y_train)
-    preds = model.predict(X_test)
-    rmse = np.sqrt(mean_squared_error(y_test, preds))
-    rmse_results[name] = rmse
-    print(f" {name}: RMSE = {rmse:.3f}")
+print("\n Training models in parallel and evaluating on TEST set...")
+leaderboard, fitted = model_selection.run("final_team_model", models, X_train, y_train, X_test, y_test)
 
 # === Pick best ===
-best_model_name = min(rmse_results, key=rmse_results.get)
-best_model = models[best_model_name]
+best_model_name = leaderboard[0]["name"]
+best_model = fitted[best_model_name]
 
 # === Save best model ===
 os.makedirs("models", exist_ok=True)
@@ -60,7 +57,7 @@ best_model.fit(X, y)
 
 # === K-Fold Cross-Validation on Full Dataset
 print("\n K-Fold Cross-Validation (5-fold):")
-cv_scores = cross_val_score(best_model, X, y, cv=5, scoring='neg_root_mean_squared_error')
+cv_scores = cross_val_score(best_model, X, y, cv=5, scoring='neg_root_mean_squared_error', n_jobs=-1)
 cv_rmse = -cv_scores
 print(f"Fold RMSEs: {np.round(cv_rmse, 4)}")
 print(f"Mean CV RMSE: {cv_rmse.mean():.4f}")
@@ -1,96 +1,72 @@
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.metrics import mean_squared_error
-from sklearn.ensemble import RandomForestRegressor
-import xgboost as xgb
+import os
+import sys
+import json
+import argparse
+import joblib
+from pathlib import Path
 import warnings
 warnings.filterwarnings("ignore")
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pipeline_logic import feature_store
+from models import backtest, tuning
+
+BEST_PARAMS_PATH = "models/tuning/best_params.json"
+
+arg_parser = argparse.ArgumentParser(description="Tune the runs models by successive halving over walk-forward folds.")
+arg_parser.add_argument("--configs", type=int, default=27, help="configurations sampled per model family")
+arg_parser.add_argument("--folds", type=int, default=3, help="walk-forward folds at the end of the season to score on")
+arg_parser.add_argument("--step-days", type=int, default=7, help="days of games in each fold")
+arg_parser.add_argument("--budget", type=float, default=None, help="seconds per family after which no new rung starts")
+arg_parser.add_argument("--workers", type=int, default=-1, help="trials run at once (-1: every core)")
+args = arg_parser.parse_args()
+
 # === Load Data ===
-df = pd.read_csv("data/team_run_prediction_dataset.csv")
+df = backtest.team_runs()
 print(f" Loaded dataset with {len(df)} rows")
 
 # === Features & Target ===
 target = "Target_Runs"
-features = [
-    "Runs_avg3", "OBP_avg3", "Team_ER_avg3", "Team_WHIP_avg3",
-    "SP_ERA_3g", "SP_WHIP_3g", "SP_IP",
-    "Opp_SP_ERA_3g", "Opp_SP_WHIP_3g", "Opp_SP_IP",
-    "Home"
-]
+features = feature_store.RUNS_FEATURES
+df = df.dropna(subset=features + [target])
 X = df[features]
 y = df[target]
 
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
-
-# === Random Forest Tuning ===
-print("\n Tuning Random Forest...")
-rf_params = {
-    "n_estimators": [100, 200],
-    "max_depth": [5, 10, None],
-    "min_samples_split": [2, 5]
-}
-rf_grid = GridSearchCV(
-    RandomForestRegressor(random_state=42),
-    rf_params,
-    cv=3,
-    scoring="neg_root_mean_squared_error",
-    n_jobs=-1
-)
-rf_grid.fit(X_train, y_train)
-
-# Best RF
-best_rf = rf_grid.best_estimator_
-rf_preds = best_rf.predict(X_test)
-rf_rmse = np.sqrt(mean_squared_error(y_test, rf_preds))
+# === Walk-forward folds: the last --folds blocks of --step-days, each trained on every earlier game
+span_days = (df["Date"].max() - df["Date"].min()).days + 1
+folds, _ = backtest.fold_matrices("team_runs", max(1, span_days - args.folds * args.step_days), args.step_days)
+if not folds:
+    sys.exit(" Not enough game days for a walk-forward fold")
+print(f" Scoring on {len(folds)} fold(s) from {folds[0]['start']}")
 
-print(f" Best Random Forest RMSE: {rf_rmse:.3f}")
-print(f"  Best Params: {rf_grid.best_params_}")
-
-# === XGBoost Tuning ===
-print("\n Tuning XGBoost...")
-xgb_params = {
-    "n_estimators": [100, 200],
-    "max_depth": [3, 6, 10],
-    "learning_rate": [0.05, 0.1]
-}
-xgb_grid = GridSearchCV(
-    xgb.XGBRegressor(random_state=42, verbosity=0),
-    xgb_params,
-    cv=3,
-    scoring="neg_root_mean_squared_error",
-    n_jobs=-1
-)
-xgb_grid.fit(X_train, y_train)
-
-# Best XGB
-best_xgb = xgb_grid.best_estimator_
-xgb_preds = best_xgb.predict(X_test)
-xgb_rmse = np.sqrt(mean_squared_error(y_test, xgb_preds))
-
-print(f" Best XGBoost RMSE: {xgb_rmse:.3f}")
-print(f"  Best Params: {xgb_grid.best_params_}")
+# === Successive halving per family (finished trials are reused from earlier runs)
+trials = tuning.read_trials()
+best = {}
+for family in tuning.FAMILIES:
+    print(f"\n Tuning {family}...")
+    params, n_estimators, rmse = tuning.successive_halving(
+        family, folds, features, n_configs=args.configs, budget=args.budget, workers=args.workers, trials=trials
+    )
+    best[family] = {"params": params, "n_estimators": n_estimators, "rmse": rmse}
+    print(f" Best {family} RMSE: {rmse:.3f}")
+    print(f"  Best Params: {params}, n_estimators={n_estimators}")
 
 # === Compare
 print("\n Final Results:")
-print(f"Random Forest RMSE: {rf_rmse:.3f}")
-print(f"XGBoost       RMSE: {xgb_rmse:.3f}")
+for family, result in best.items():
+    print(f"{family:<14} RMSE: {result['rmse']:.3f}")
+
+os.makedirs(os.path.dirname(BEST_PARAMS_PATH), exist_ok=True)
+with open(BEST_PARAMS_PATH, "w") as f:
+    json.dump(best, f, indent=2)
 
-# === Retrain Final Model on All Data
-final_model = RandomForestRegressor(
-    n_estimators=100,
-    max_depth=None,
-    min_samples_split=2,
-    random_state=42
-)
+# === Retrain Final Model on All Data with the tuned Random Forest configuration
+rf = best["RandomForest"]
+final_model = tuning.build("RandomForest", rf["params"], rf["n_estimators"])
 final_model.fit(X, y)
 print(" Trained final Random Forest model on all data")
 
 # === Save the model
-import joblib, os
 os.makedirs("models", exist_ok=True)
 joblib.dump(final_model, "models/final_rf_model.joblib")
 print(" Model saved to: models/final_rf_model.joblib")
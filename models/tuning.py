@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import ParameterSampler
+from xgboost import XGBRegressor
+
+from models import model_selection
+
+TRIALS_PATH = "models/tuning/trials.jsonl"
+
+# family → (estimator, fixed parameters, search space); n_estimators is the halving resource
+FAMILIES = {
+    "RandomForest": (RandomForestRegressor, {"random_state": 42}, {
+        "max_depth": [4, 6, 8, 10, 14, None],
+        "min_samples_split": [2, 5, 10],
+        "min_samples_leaf": [1, 2, 4],
+        "max_features": [1.0, 0.7, 0.5, "sqrt"],
+    }),
+    # One thread per trial: trials already run in parallel
+    "XGBoost": (XGBRegressor, {"random_state": 42, "verbosity": 0, "n_jobs": 1}, {
+        "max_depth": [2, 3, 4, 6, 8],
+        "learning_rate": [0.02, 0.05, 0.1, 0.2],
+        "subsample": [0.6, 0.8, 1.0],
+        "colsample_bytree": [0.6, 0.8, 1.0],
+        "min_child_weight": [1, 3, 5],
+        "reg_lambda": [0.5, 1.0, 5.0],
+    }),
+}
+# Smallest ensemble a configuration is tried at; each rung keeps 1/ETA of the configurations at ETA× the size
+MIN_ESTIMATORS = {"RandomForest": 25, "XGBoost": 50}
+ETA = 3
+
+
+def sample_configs(family, n):
+    """``n`` configurations of ``family``, the same ones on every run so a search can resume."""
+    _, _, space = FAMILIES[family]
+    return [dict(sorted(c.items())) for c in ParameterSampler(space, n_iter=n, random_state=42)]
+
+
+def build(family, params, n_estimators):
+    estimator, fixed, _ = FAMILIES[family]
+    return estimator(**fixed, **params, n_estimators=n_estimators)
+
+
+# === Trial store (one JSON line per finished trial)
+def _trial_key(dataset, family, params, n_estimators):
+    return json.dumps([dataset, family, params, n_estimators], sort_keys=True)
+
+
+def read_trials(path=TRIALS_PATH):
+    trials = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                # A line cut short by an interrupted run is simply redone
+                try:
+                    trial = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                trials[_trial_key(trial["dataset"], trial["family"], trial["params"], trial["n_estimators"])] = trial
+    return trials
+
+
+def _append_trial(trial, path=TRIALS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab+") as f:
+        # Start a fresh line after one cut short by an interrupted run
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write((json.dumps(trial) + "\n").encode())
+
+
+# === Trials
+def _run_trial(family, params, n_estimators, folds, features):
+    start = time.perf_counter()
+    fold_rmse = []
+    for fold in folds:
+        data = model_selection.open_shared(fold["paths"], features)
+        model = build(family, params, n_estimators).fit(data["X_train"], data["y_train"])
+        fold_rmse.append(float(np.sqrt(np.mean((np.asarray(data["y_test"]) - model.predict(data["X_test"])) ** 2))))
+    return {
+        "family": family, "params": params, "n_estimators": n_estimators,
+        "rmse": float(np.mean(fold_rmse)), "fold_rmse": fold_rmse, "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def successive_halving(family, folds, features, n_configs=27, rungs=3, budget=None, workers=-1, trials=None):
+    """Best ``(params, n_estimators, rmse)`` of ``family`` by successive halving over walk-forward folds.
+
+    Every configuration starts at ``MIN_ESTIMATORS`` trees; after each rung
+    the best 1/``ETA`` move on with ``ETA`` times as many. A trial is the
+    mean RMSE over ``folds`` (see ``backtest.fold_matrices``) and is
+    appended to the trial store as soon as it finishes, so an interrupted
+    search resumes where it stopped. Once ``budget`` seconds have passed no
+    new rung is started. The winner is the best configuration of the last
+    rung that ran, returned with the full ensemble size of the final rung
+    (``rmse`` is its score at the rung it was last scored on).
+    """
+    trials = read_trials() if trials is None else trials
+    dataset = folds[0]["key"]
+    configs = sample_configs(family, n_configs)
+    started = time.perf_counter()
+    survivors, n_estimators = configs, MIN_ESTIMATORS[family]
+
+    for rung in range(rungs):
+        pending = [c for c in survivors if _trial_key(dataset, family, c, n_estimators) not in trials]
+        print(f" {family} rung {rung}: {len(survivors)} config(s) at {n_estimators} trees, "
+              f"{len(survivors) - len(pending)} from earlier runs")
+        results = Parallel(n_jobs=workers, return_as="generator_unordered")(
+            delayed(_run_trial)(family, c, n_estimators, folds, features) for c in pending
+        )
+        for trial in results:
+            trial["dataset"] = dataset
+            trials[_trial_key(dataset, family, trial["params"], n_estimators)] = trial
+            _append_trial(trial)
+
+        scored = sorted(survivors, key=lambda c: trials[_trial_key(dataset, family, c, n_estimators)]["rmse"])
+        top = trials[_trial_key(dataset, family, scored[0], n_estimators)]
+        print(f"   best RMSE {top['rmse']:.3f} with {scored[0]}")
+
+        if len(scored) == 1 or (budget is not None and time.perf_counter() - started > budget):
+            break
+        survivors, n_estimators = scored[:max(1, len(scored) // ETA)], n_estimators * ETA
+    # Only configurations scored at the same size are compared: the minimum over the many
+    # cheap first-rung trials is biased low. A search cut short is refit at the full size.
+    return scored[0], MIN_ESTIMATORS[family] * ETA ** (rungs - 1), top["rmse"]
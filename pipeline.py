@@ -12,13 +12,16 @@ def log_msg(message):
     print(entry)
 
 steps = [
-    (" Step 1: Scrape latest data", "pipeline_logic/Step1_Scrape_All.py"),
-    ("🧱 Step 2: Build training dataset", "pipeline_logic/build_team_runs_dataset.py"),
-    ("🧠 Step 3: Predict upcoming games", "pipeline_logic/predict_runs.py"),
-    (" Step 4: Backfill historical predictions", "pipeline_logic/backfill_predictions.py"),
-    (" Step 5: Backfill pitcher K predictions", "pipeline_logic/backfill_pitcher_ks.py"),
-    (" Step 6: Predict pitcher strikeouts (future)", "pipeline_logic/predict_pitcher_ks.py"),
-    (" Step 7: Predict team over/under picks", "pipeline_logic/predict_team_overs_and_unders.py"),
+    (" Step 1: Scrape latest data", "pipeline_logic/Step1_Scrape_All.py --parallel"),
+    ("🗃 Step 2: Materialize feature store", "pipeline_logic/feature_store.py"),
+    ("🧱 Step 3: Build training dataset", "pipeline_logic/build_team_runs_dataset.py"),
+    ("🔁 Step 4: Fold new days into the models", "models/retrain.py"),
+    ("🌲 Step 5: Compile models for inference", "models/compile_trees.py"),
+    ("🧠 Step 6: Predict upcoming games", "pipeline_logic/predict_runs.py"),
+    (" Step 7: Backfill historical predictions", "pipeline_logic/backfill_predictions.py"),
+    (" Step 8: Backfill pitcher K predictions", "pipeline_logic/backfill_pitcher_ks.py"),
+    (" Step 9: Predict pitcher strikeouts (future)", "pipeline_logic/predict_pitcher_ks.py"),
+    (" Step 10: Predict team over/under picks", "pipeline_logic/predict_team_overs_and_unders.py"),
     (" DONE! Now run: streamlit run app.py", None),
 ]
 
@@ -27,7 +30,7 @@ for label, script in steps:
     log_msg(f"=== {label} ===")
     if script:
         start = time.time()
-        result = subprocess.run(["python", script])
+        result = subprocess.run(["python"] + script.split())
         elapsed = round(time.time() - start, 2)
         if result.returncode != 0:
             log_msg(f" Error in {script} (⏱ {elapsed}s). Halting pipeline.")
@@ -1,26 +1,152 @@
+import argparse
+import queue
 import subprocess
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrape_logic import ScrapePitcherGameData, ScrapeTeamBatting, ScrapeTeamPitching
+from scrape_logic.stathead_http import StatheadHTTPSession, open_session
+from scrape_logic.stathead_session import StatheadSession
 
 scripts = [
     "utilities/scrape_schedule_and_starters.py",
-    "scrape_logic/ScrapePitcherGameData.py",
-    "scrape_logic/ScrapeTeamBatting.py",
-    "scrape_logic/ScrapeTeamPitching.py"
 ]
 
-print(f" Starting scrape pipeline at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-start_time = time.time()
+# Stathead finders share one logged-in session (HTTP, or Selenium as fallback)
+finders = [
+    ScrapePitcherGameData,
+    ScrapeTeamBatting,
+    ScrapeTeamPitching,
+]
+
+
+# === Job helpers
+def run_script(script, *script_args):
+    subprocess.run(["python", script, *script_args], check=True)
+
+
+def timed(name, fn, *args):
+    start = time.time()
+    try:
+        fn(*args)
+        error = None
+    except Exception as e:
+        error = e
+    elapsed = round(time.time() - start, 2)
+    if error is None:
+        print(f" {name} completed successfully (⏱ {elapsed}s).")
+    else:
+        print(f" Error running {name} (⏱ {elapsed}s): {error}")
+    return {"name": name, "ok": error is None, "seconds": elapsed, "error": error}
+
+
+def print_report(results):
+    print("\n Scrape report:")
+    for r in results:
+        status = "OK  " if r["ok"] else "FAIL"
+        detail = "" if r["ok"] else f" → {r['error']}"
+        print(f"   {status} {r['name']:<45} {r['seconds']:>8.2f}s{detail}")
+    failed = [r for r in results if not r["ok"]]
+    print(f" {len(results) - len(failed)}/{len(results)} scrapers succeeded.")
+
+
+# === Sequential mode: one step after another, halting on the first failure
+def run_sequential(backend):
+    results = []
+    for script in scripts:
+        print(f"\n Running {script}...")
+        results.append(timed(script, run_script, script))
+        if not results[-1]["ok"]:
+            return results
+
+    with open_session(backend) as session:
+        for finder in finders:
+            print(f"\n Running {finder.NAME} finder...")
+            results.append(timed(f"{finder.NAME} finder", finder.run, session))
+            if not results[-1]["ok"]:
+                break
+    return results
+
+
+# === Parallel mode: independent scrapes on a worker pool
+def run_parallel(max_workers, backend):
+    # Log in once; the pooled HTTP session is shared by every worker, while
+    # extra browsers reuse the login cookies instead of the form
+    login = open_session(backend, pool_size=max_workers)
+    cookies = login.cookies
+    idle = queue.SimpleQueue()
+    idle.put(login)
+    opened = [login]
+
+    def run_finder(finder):
+        if isinstance(login, StatheadHTTPSession):
+            finder.run(login)
+            return
+        try:
+            session = idle.get_nowait()
+        except queue.Empty:
+            session = StatheadSession(cookies=cookies)
+            opened.append(session)
+        try:
+            finder.run(session)
+        finally:
+            idle.put(session)
 
-for script in scripts:
-    print(f"\n Running {script}...")
     try:
-        result = subprocess.run(["python", script], check=True)
-        print(f" {script} completed successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f" Error running {script}: {e}")
-        break
-
-end_time = time.time()
-elapsed = round(end_time - start_time, 2)
-print(f"\n Scrape pipeline finished in {elapsed} seconds.")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(timed, script, run_script, script) for script in scripts]
+            futures += [
+                pool.submit(timed, f"{finder.NAME} finder", run_finder, finder)
+                for finder in finders
+            ]
+            return [f.result() for f in futures]
+    finally:
+        for session in opened:
+            session.close()
+
+
+# === Replay mode: rebuild every output from one day's page cache, offline
+def run_replay(day):
+    results = []
+    for script in scripts:
+        print(f"\n Replaying {script}...")
+        results.append(timed(script, run_script, script, "--replay", day))
+    for finder in finders:
+        print(f"\n Replaying {finder.NAME} finder...")
+        results.append(timed(f"{finder.NAME} finder", lambda f=finder: f.save(f.replay(day), day=day)))
+    return results
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Scrape the ESPN schedule and Stathead game logs.")
+    arg_parser.add_argument("--parallel", action="store_true", help="run independent scrapers concurrently")
+    arg_parser.add_argument("--max-workers", type=int, default=4, help="concurrency cap for --parallel")
+    arg_parser.add_argument("--backend", choices=["http", "selenium"], default="http",
+                            help="Stathead fetch backend (http falls back to selenium)")
+    arg_parser.add_argument("--replay", metavar="DATE",
+                            help="re-parse pages cached on DATE (YYYY-MM-DD) instead of fetching")
+    args = arg_parser.parse_args()
+
+    if args.replay:
+        mode = f"replay of {args.replay}"
+    else:
+        mode = f"parallel, {args.max_workers} workers" if args.parallel else "sequential"
+        mode += f", {args.backend} backend"
+    print(f" Starting scrape pipeline ({mode}) at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    start_time = time.time()
+
+    if args.replay:
+        results = run_replay(args.replay)
+    elif args.parallel:
+        results = run_parallel(args.max_workers, args.backend)
+    else:
+        results = run_sequential(args.backend)
+
+    end_time = time.time()
+    elapsed = round(end_time - start_time, 2)
+    print_report(results)
+    print(f"\n Scrape pipeline finished in {elapsed} seconds.")
@@ -1,129 +1,76 @@
-import pandas as pd
+import os
+import sys
+import json
+import argparse
 import numpy as np
-from unidecode import unidecode
-
-print(" Starting script...")
-
-# === Load Data ===
-pitcher_df = pd.read_csv("data/Stathead_2025_Pitcher_Master.csv")
-batting_df = pd.read_csv("data/Stathead_2025_TeamBatting_Master.csv")
-team_pitching_df = pd.read_csv("data/Stathead_2025_TeamPitching_Master.csv")
-
-print(f" Loaded pitcher_df: {len(pitcher_df)} rows")
-print(f" Loaded batting_df: {len(batting_df)} rows")
-print(f" Loaded team_pitching_df: {len(team_pitching_df)} rows")
-
-# === Clean & Parse Dates ===
-pitcher_df["Date"] = pd.to_datetime(pitcher_df["Date"].astype(str).str.extract(r"^(\d{4}-\d{2}-\d{2})")[0])
-batting_df["Date"] = pd.to_datetime(batting_df["Date"], errors="coerce")
-team_pitching_df["Date"] = pd.to_datetime(team_pitching_df["Date"], errors="coerce")
-
-# === Identify Starting Pitchers ===
-pitcher_df["Home"] = pitcher_df["Unnamed: 5"].ne("@").astype(int)
-ip_parts = pitcher_df["IP"].astype(str).str.extract(r"(?P<whole>\d+)(?:\.(?P<frac>\d))?")
-pitcher_df["IP_float"] = ip_parts["whole"].astype(float) + ip_parts["frac"].fillna(0).astype(float) / 3.0
-pitcher_df["Is_SP"] = pitcher_df["IP_float"] >= 3.5
-starters = pitcher_df[pitcher_df["Is_SP"]].copy()
-starters = starters.sort_values("BF", ascending=False).dropna(subset=["BF"])
-starters = starters.groupby(["Date", "Team"]).head(1)
-
-print(f" Found {len(starters)} starting pitcher rows")
-
-# === Get SP Rolling Stats ===
-def rolling_pitcher_stats(df, window=3):
-    df = df.sort_values(["Player", "Date"])
-    df["ER"] = pd.to_numeric(df["ER"], errors="coerce").fillna(0)
-    df["H"] = pd.to_numeric(df["H"], errors="coerce").fillna(0)
-    df["BB"] = pd.to_numeric(df["BB"], errors="coerce").fillna(0)
-    ip_parts = df["IP"].astype(str).str.extract(r"(?P<whole>\d+)(?:\.(?P<frac>\d))?")
-    df["IP_float"] = ip_parts["whole"].astype(float) + ip_parts["frac"].fillna(0).astype(float) / 3.0
-
-    rolling = df.groupby("Player").rolling(window=window, on="Date").agg({
-        "ER": "sum",
-        "IP_float": "sum",
-        "H": "sum",
-        "BB": "sum"
-    }).reset_index()
-
-    rolling["ERA_rolling"] = (rolling["ER"] * 9) / rolling["IP_float"].replace(0, np.nan)
-    rolling["WHIP_rolling"] = (rolling["H"] + rolling["BB"]) / rolling["IP_float"].replace(0, np.nan)
+import pandas as pd
+from pathlib import Path
 
-    return rolling[["Player", "Date", "ERA_rolling", "WHIP_rolling"]]
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pipeline_logic import feature_store
 
-sp_rolling = rolling_pitcher_stats(pitcher_df)
+DATASET_CSV = "data/team_run_prediction_dataset.csv"
+# Feature store build and generation the dataset was last built from
+DATASET_STATE = "data/index/team_run_prediction_dataset.json"
 
-print(f" sp_rolling generated: {len(sp_rolling)} rows")
+arg_parser = argparse.ArgumentParser(description="Build the team runs training dataset.")
+arg_parser.add_argument("--full", action="store_true", help="rebuild every date instead of only the changed ones")
+args = arg_parser.parse_args()
 
+print(" Starting script...")
 
-# === Normalize names for merge
-def normalize_name(name):
-    return unidecode(str(name)).lower().strip()
+# === Which dates need rebuilding
+built = {}
+if not args.full and os.path.exists(DATASET_STATE) and os.path.exists(DATASET_CSV):
+    with open(DATASET_STATE) as f:
+        built = json.load(f)
+built_generation = built.get("generation", 0)
+# A store rebuilt since (or state from before build ids) gives None: every date is rebuilt
+build_id, generation, changed_dates = feature_store.changes_since(built.get("build_id"), built_generation)
+
+# === Load Features (materialized once per pipeline run) ===
+pitcher_games = feature_store.load("pitcher_games")
+starters = feature_store.load("starters").copy()
+batting_df = feature_store.load("team_batting")
+pitching_rolling = feature_store.load("team_pitching")
+
+print(f" Loaded pitcher_games: {len(pitcher_games)} rows")
+print(f" Loaded team_batting: {len(batting_df)} rows")
+print(f" Loaded team_pitching: {len(pitching_rolling)} rows")
+print(f" Found {len(starters)} starting pitcher rows")
 
-starters["Player"] = starters["Player"].apply(normalize_name)
-sp_rolling["Player"] = sp_rolling["Player"].apply(normalize_name)
+# Training uses full three-game windows only
+short = starters["N_3g"] < feature_store.WINDOW
+starters.loc[short, ["SP_ERA_3g", "SP_WHIP_3g"]] = np.nan
+starters = starters.drop(columns="Player").rename(columns={"Player_key": "Player", "SP_ERA_3g": "ERA_rolling", "SP_WHIP_3g": "WHIP_rolling"})
 
 # === DEBUG: show sample merge keys
 print(" Starter Info Keys:")
 print(starters[["Player", "Date"]].drop_duplicates().head())
 
-print(" Rolling Stats Keys:")
-print(sp_rolling[["Player", "Date"]].drop_duplicates().head())
-
-# === Batting Rolling
-batting_df = batting_df.sort_values(["Team", "Date"])
-batting_df["Runs"] = pd.to_numeric(batting_df["R"], errors="coerce")
-batting_df["OBP"] = pd.to_numeric(batting_df["OBP"], errors="coerce")
-
-batting_rolling = batting_df.groupby("Team").rolling(3, on="Date").agg({
-    "Runs": "mean", "OBP": "mean"
-}).reset_index().rename(columns={"Runs": "Runs_avg3", "OBP": "OBP_avg3"})
-
-print(f" Team batting rolling: {len(batting_rolling)} rows")
-
-# === Team Pitching Rolling
-team_pitching_df["H"] = pd.to_numeric(team_pitching_df["H"], errors="coerce").fillna(0)
-team_pitching_df["BB"] = pd.to_numeric(team_pitching_df["BB"], errors="coerce").fillna(0)
-team_pitching_df["ER"] = pd.to_numeric(team_pitching_df["ER"], errors="coerce").fillna(0)
-
-ip_parts = team_pitching_df["IP"].astype(str).str.extract(r"(?P<whole>\d+)(?:\.(?P<frac>\d))?")
-team_pitching_df["IP_float"] = ip_parts["whole"].astype(float) + ip_parts["frac"].fillna(0).astype(float) / 3.0
-team_pitching_df["WHIP"] = (team_pitching_df["H"] + team_pitching_df["BB"]) / team_pitching_df["IP_float"].replace(0, np.nan)
-
-pitching_rolling = team_pitching_df.sort_values(["Team", "Date"]).groupby("Team").rolling(3, on="Date").agg({
-    "ER": "mean", "WHIP": "mean"
-}).reset_index().rename(columns={"ER": "Team_ER_avg3", "WHIP": "Team_WHIP_avg3"})
-
-print(f" Opponent team pitching rolling: {len(pitching_rolling)} rows")
-
 # === Build Dataset
-final_df = batting_df[["Date", "Team", "Opp", "Runs"]].copy()
+final_df = batting_df[["Game_ID", "Date", "Team", "Opp", "Runs", "Runs_avg3", "OBP_avg3"]].copy()
+if changed_dates is not None:
+    # Every merge below is keyed on the game, so unchanged dates keep their rows
+    final_df = final_df[final_df["Date"].isin(changed_dates)]
+    print(f" Incremental build: {len(changed_dates)} changed date(s) since generation {built_generation}")
 print(" Initial team-game base:", len(final_df))
 
-final_df = final_df.merge(batting_rolling[["Team", "Date", "Runs_avg3", "OBP_avg3"]], on=["Team", "Date"], how="left")
-final_df = final_df.merge(pitching_rolling.rename(columns={"Team": "Opp"}), on=["Opp", "Date"], how="left")
+final_df = final_df.merge(
+    pitching_rolling[["Team", "Game_ID", "Team_ER_avg3", "Team_WHIP_avg3"]].rename(columns={"Team": "Opp"}),
+    on=["Opp", "Game_ID"], how="left"
+)
 
 # === Merge SP Info
-starter_info = starters[["Date", "Team", "Player", "IP_float", "Home"]].drop_duplicates(subset=["Date", "Team"])
-starter_info["Player"] = starter_info["Player"].apply(normalize_name)
-starter_info = starter_info.merge(sp_rolling, on=["Player", "Date"], how="left")
-
 final_df = final_df.merge(
-    starter_info[["Date", "Team", "Player", "IP_float", "ERA_rolling", "WHIP_rolling", "Home"]],
-    on=["Date", "Team"], how="left"
+    starters[["Game_ID", "Team", "Player", "IP_float", "ERA_rolling", "WHIP_rolling", "Home"]],
+    on=["Game_ID", "Team"], how="left"
 )
 
 # === Opponent SP
-opp_starters = pitcher_df[pitcher_df["IP_float"] >= 3.5].copy()
-opp_starters = opp_starters.sort_values("BF", ascending=False).dropna(subset=["BF"])
-opp_starters = opp_starters.groupby(["Date", "Team"]).head(1)
-
-opp_starters["Player"] = opp_starters["Player"].apply(normalize_name)
-opp_starter_info = opp_starters[["Date", "Team", "Player", "IP_float"]].copy()
-opp_starter_info = opp_starter_info.merge(sp_rolling, on=["Player", "Date"], how="left")
-
 final_df = final_df.merge(
-    opp_starter_info[["Date", "Team", "Player", "IP_float", "ERA_rolling", "WHIP_rolling"]],
-    left_on=["Date", "Opp"], right_on=["Date", "Team"], how="left", suffixes=("", "_opp")
+    starters[["Game_ID", "Team", "Player", "IP_float", "ERA_rolling", "WHIP_rolling"]],
+    left_on=["Game_ID", "Opp"], right_on=["Game_ID", "Team"], how="left", suffixes=("", "_opp")
 )
 
 # === Final Rename
@@ -156,11 +103,22 @@ final_df.dropna(subset=[
     "Home"
 ], inplace=True)
 
+final_df = final_df.drop(columns="Game_ID")
 print(" Final dataset row count:", len(final_df))
 print("🧪 Sample with Opponent SP + Home flag:\n", final_df[[
     "Date", "Team", "Opp", "Home", "Opp_SP_Name", "Opp_SP_ERA_3g", "Opp_SP_IP"
 ]].head())
 
 # === Export
-final_df.to_csv("data/team_run_prediction_dataset.csv", index=False)
-print(" Dataset exported to 'data/team_run_prediction_dataset.csv'")
+if changed_dates is not None:
+    kept = pd.read_csv(DATASET_CSV, parse_dates=["Date"], float_precision="round_trip")
+    kept = kept[~kept["Date"].isin(changed_dates)]
+    print(f" Kept {len(kept)} unchanged row(s), rebuilt {len(final_df)}")
+    final_df = pd.concat([kept, final_df[kept.columns]], ignore_index=True)
+    final_df = final_df.sort_values(["Team", "Date"], kind="stable")
+
+final_df.to_csv(DATASET_CSV, index=False)
+os.makedirs(os.path.dirname(DATASET_STATE), exist_ok=True)
+with open(DATASET_STATE, "w") as f:
+    json.dump({"build_id": build_id, "generation": generation}, f)
+print(f" Dataset exported to '{DATASET_CSV}'")
@@ -0,0 +1,516 @@
+import io
+import os
+import sys
+import json
+import uuid
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrape_logic import ScrapePitcherGameData, ScrapeTeamBatting, ScrapeTeamPitching
+from scrape_logic.pitcher_identity import PitcherIdentityIndex
+from pipeline_logic import ingest, rolling_windows
+
+FEATURE_DIR = "data/features"
+MANIFEST = os.path.join(FEATURE_DIR, "manifest.json")
+TABLES = ["pitcher_games", "starters", "team_batting", "team_pitching"]
+MASTERS = [ScrapePitcherGameData, ScrapeTeamBatting, ScrapeTeamPitching]
+SP_MIN_IP = 3.5
+STARTER_ORDER = ["Date", "Team", "Game"]
+# Bumped when table contents change shape, so existing stores are rebuilt
+STORE_FORMAT = 5
+WINDOW = 3
+
+# Inputs of the team runs models, in training order
+RUNS_FEATURES = [
+    "Runs_avg3", "OBP_avg3", "Team_ER_avg3", "Team_WHIP_avg3",
+    "SP_ERA_3g", "SP_WHIP_3g", "SP_IP",
+    "Opp_SP_ERA_3g", "Opp_SP_WHIP_3g", "Opp_SP_IP",
+    "Home",
+]
+
+
+# === Row cleaning of the typed masters (no history needed)
+def clean_pitcher_games(df):
+    df = ingest.resolve_games(df.dropna(subset=["Date"]), ingest.load("team_pitching"))
+    df["IP"] = ingest.ip_notation(df["IP_outs"])
+    df["IP_float"] = ingest.innings(df["IP_outs"])
+    df[["ER", "H", "BB"]] = df[["ER", "H", "BB"]].fillna(0)
+    df["Is_SP"] = df["IP_float"] >= SP_MIN_IP
+    return df[["Player", "Player_key", "Game_ID", "Date", "Game", "Team", "Opp", "Home", "Is_SP", "IP", "IP_outs", "IP_float", "H", "BB", "ER", "SO", "BF"]]
+
+
+def clean_team_batting(df):
+    df = df.dropna(subset=["Date"]).rename(columns={"R": "Runs"})
+    return df[["Team", "Game_ID", "Date", "Game", "Opp", "Home", "Runs", "OBP"]]
+
+
+def clean_team_pitching(df):
+    df = df.dropna(subset=["Date"]).copy()
+    df[["ER", "H", "BB"]] = df[["ER", "H", "BB"]].fillna(0)
+    df["IP_float"] = ingest.innings(df["IP_outs"])
+    df["WHIP"] = (df["H"] + df["BB"]) / df["IP_float"].replace(0, np.nan)
+    return df[["Team", "Game_ID", "Date", "Game", "Opp", "ER", "H", "BB", "WHIP", "IP_outs", "IP_float"]]
+
+
+# === Rolling windows (rows must be sorted by key, date and game number)
+def _with_state(df, state):
+    return pd.concat([df.drop(columns=state.columns, errors="ignore"), state], axis=1)
+
+
+def roll_pitcher_games(df):
+    """Trailing SP and K features per pitcher over every window in ``rolling_windows``.
+
+    Windows include the row's own game and may hold fewer games than their
+    length (``N_3g``, ``N_5g``, ``N_10g``); callers that need a full window
+    filter on the count. Ratios come from summed outs, runs and baserunners.
+    """
+    components = ["ER", "H", "BB", "SO", "BF", "IP_outs", "IP_whole", "IP_frac"]
+    sums, state = rolling_windows.window_sums(
+        df.assign(IP_whole=df["IP_outs"] // 3, IP_frac=df["IP_outs"] % 3), "Player_key", components
+    )
+    for k in rolling_windows.GAME_WINDOWS:
+        df[f"N_{k}g"] = sums[("_n", f"{k}g")].astype(int)
+
+    outs_3g = sums[("IP_outs", "3g")]
+    df["SP_ERA_3g"] = sums[("ER", "3g")] * 27 / outs_3g.replace(0, np.nan)
+    df["SP_WHIP_3g"] = (sums[("H", "3g")] + sums[("BB", "3g")]) * 3 / outs_3g.replace(0, np.nan)
+    df["SP_IP_3g"] = outs_3g / 3
+
+    # Strikeout model inputs: per-game means (IP in box-score notation, as trained)
+    n_3g = sums[("_n", "3g")]
+    df["K_last3"] = sums[("SO", "3g")] / n_3g
+    df["IP_last3"] = (sums[("IP_whole", "3g")] + sums[("IP_frac", "3g")] / 10) / n_3g
+    df["ER_last3"] = sums[("ER", "3g")] / n_3g
+    df["BB_last3"] = sums[("BB", "3g")] / n_3g
+    df["BF_last3"] = sums[("BF", "3g")] / n_3g
+
+    for label in rolling_windows.LABELS[1:]:
+        outs = sums[("IP_outs", label)].replace(0, np.nan)
+        df[f"SP_ERA_{label}"] = sums[("ER", label)] * 27 / outs
+        df[f"SP_WHIP_{label}"] = (sums[("H", label)] + sums[("BB", label)]) * 3 / outs
+        df[f"SP_K9_{label}"] = sums[("SO", label)] * 27 / outs
+        df[f"SP_IP_avg_{label}"] = rolling_windows.per_game(sums, "IP_outs", label) / 3
+    return _with_state(df, state)
+
+
+def _window_name(stem, label):
+    # The 3-game columns keep the names the models were trained on
+    return f"{stem}3" if label == "3g" else f"{stem}_{label}"
+
+
+def roll_team_batting(df):
+    """Per-game run and OBP averages; game windows stay blank until they are full."""
+    sums, state = rolling_windows.window_sums(df.assign(OBP_milli=(df["OBP"] * 1000).round()), "Team", ["Runs", "OBP_milli"])
+    for label in rolling_windows.LABELS:
+        full = rolling_windows.full(sums, label)
+        df[_window_name("Runs_avg", label)] = rolling_windows.per_game(sums, "Runs", label).where(full)
+        df[_window_name("OBP_avg", label)] = (rolling_windows.per_game(sums, "OBP_milli", label) / 1000).where(full)
+    return _with_state(df, state)
+
+
+def roll_team_pitching(df):
+    """Per-game earned runs and WHIP from summed hits, walks and outs."""
+    sums, state = rolling_windows.window_sums(df, "Team", ["ER", "H", "BB", "IP_outs"])
+    for label in rolling_windows.LABELS:
+        full = rolling_windows.full(sums, label)
+        outs = sums[("IP_outs", label)].replace(0, np.nan)
+        df[_window_name("Team_ER_avg", label)] = rolling_windows.per_game(sums, "ER", label).where(full)
+        df[_window_name("Team_WHIP_avg", label)] = ((sums[("H", label)] + sums[("BB", label)]) * 3 / outs).where(full)
+    return _with_state(df, state)
+
+
+def build_starters(pitcher_games):
+    """The starter of each team-game (``Game_ID``, ``Team``): the appearance of 3.5+ IP that faced the most batters."""
+    starters = pitcher_games[pitcher_games["Is_SP"]].dropna(subset=["BF"])
+    starters = starters.sort_values("BF", ascending=False, kind="stable")
+    starters = starters.groupby(["Game_ID", "Team"], observed=True).head(1)
+    return starters.sort_values(STARTER_ORDER, kind="stable").reset_index(drop=True)
+
+
+# Rolled table → (master, entity key, cleaner, roller)
+ROLLED = {
+    "pitcher_games": (ScrapePitcherGameData, "Player_key", clean_pitcher_games, roll_pitcher_games),
+    "team_batting": (ScrapeTeamBatting, "Team", clean_team_batting, roll_team_batting),
+    "team_pitching": (ScrapeTeamPitching, "Team", clean_team_pitching, roll_team_pitching),
+}
+
+
+def _split(name, rolled):
+    """Feature table (running ``_`` columns dropped) and the seed rows for the next update."""
+    key = ROLLED[name][1]
+    table = rolled.drop(columns=[c for c in rolled.columns if c.startswith("_")])
+    state = rolling_windows.state_rows(rolled.drop(columns="_new", errors="ignore"), key)
+    return table, state.reset_index(drop=True)
+
+
+def _order(key):
+    return [key, "Date", "Game"]
+
+
+def build_rolled(name, raw):
+    _, key, clean, roll = ROLLED[name]
+    # A game scraped twice (once with its doubleheader suffix, once without) is kept once
+    df = clean(raw).drop_duplicates(subset=[key, "Game_ID"])
+    df = df.sort_values(_order(key), kind="stable").reset_index(drop=True)
+    return _split(name, roll(df))
+
+
+# === Materialization
+def _tail_hash(f, size):
+    f.seek(max(size - 1024, 0))
+    return hashlib.blake2b(f.read(min(size, 1024)), digest_size=8).hexdigest()
+
+
+def _source_state(path):
+    """Size plus a hash of the bytes just before it, enough to tell an append from a rewrite."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        return {"size": size, "tail": _tail_hash(f, size)}
+
+
+def _table_path(name):
+    return os.path.join(FEATURE_DIR, f"{name}.feather")
+
+
+def _state_path(name):
+    return os.path.join(FEATURE_DIR, "state", f"{name}.feather")
+
+
+def _manifest_json():
+    if not os.path.exists(MANIFEST):
+        return {}
+    with open(MANIFEST) as f:
+        return json.load(f)
+
+
+def _read_manifest():
+    """The manifest of a complete store in the current format, else ``None``."""
+    manifest = _manifest_json()
+    if manifest.get("format") != STORE_FORMAT or not all(os.path.exists(_table_path(t)) for t in TABLES):
+        return None
+    return manifest
+
+
+def is_fresh():
+    manifest = _read_manifest()
+    if manifest is None:
+        return False
+    return all(manifest["sources"].get(f.MASTER_CSV) == _source_state(f.MASTER_CSV) for f in MASTERS)
+
+
+def _write(tables, states, sources, changed_dates=None):
+    """Write the tables, the rolling state and the manifest.
+
+    The manifest keeps a generation counter, the generation of the last full
+    rebuild (``changed_dates`` is ``None``) and the generation in which each
+    game date last changed since then, so downstream builds can ask which
+    dates to redo via ``changes_since``. Every full rebuild also draws a new
+    ``build_id``: the counter restarts when the store directory is wiped, so
+    a generation only means something together with its build.
+    """
+    previous = _manifest_json()
+    generation = previous.get("generation", 0) + 1
+    if changed_dates is None or "build_id" not in previous:
+        build_id, rebuilt, dates = uuid.uuid4().hex, generation, {}
+    else:
+        build_id, rebuilt, dates = previous["build_id"], previous.get("rebuilt", generation), dict(previous.get("dates", {}))
+        dates.update({pd.Timestamp(day).date().isoformat(): generation for day in changed_dates})
+
+    os.makedirs(os.path.join(FEATURE_DIR, "state"), exist_ok=True)
+    for name, df in tables.items():
+        df.reset_index(drop=True).to_feather(_table_path(name))
+    for name, state in states.items():
+        state.to_feather(_state_path(name))
+    with open(MANIFEST, "w") as f:
+        json.dump({
+            "format": STORE_FORMAT,
+            "build_id": build_id,
+            "sources": sources,
+            "rows": {n: len(df) for n, df in tables.items()},
+            "generation": generation,
+            "rebuilt": rebuilt,
+            "dates": dict(sorted(dates.items())),
+        }, f, indent=2)
+
+
+def materialize():
+    """Rebuild every feature table from the masters and write them as Feather files."""
+    os.makedirs(FEATURE_DIR, exist_ok=True)
+    tables, states, sources = {}, {}, {}
+    for name, (finder, _, _, _) in ROLLED.items():
+        sources[finder.MASTER_CSV] = _source_state(finder.MASTER_CSV)
+        tables[name], states[name] = build_rolled(name, ingest.load(name))
+    tables["starters"] = build_starters(tables["pitcher_games"])
+    _write(tables, states, sources)
+    _loaded.clear()
+    _loaded.update(tables)
+    return tables
+
+
+def _appended_rows(name, previous):
+    """Typed rows appended to a master since ``previous`` was recorded, or ``None`` if it was rewritten.
+
+    ``MasterTable.append`` only ever adds unseen keys at the end of the file,
+    so the bytes past the recorded size are exactly the new games.
+    """
+    path = ROLLED[name][0].MASTER_CSV
+    size = os.path.getsize(path)
+    if previous is None or size < previous["size"]:
+        return None
+    with open(path, "rb") as f:
+        header = f.readline()
+        if _tail_hash(f, previous["size"]) != previous.get("tail"):
+            return None
+        f.seek(previous["size"])
+        added = ingest.read_raw(io.BytesIO(header + f.read()))
+    return ingest.dedupe(name, ingest.parse(name, added))
+
+
+def update():
+    """Fold rows appended to the masters since the last build into the feature store.
+
+    Only entities (pitchers, teams) that appear in the new rows are re-rolled,
+    each seeded from its saved state rows (``rolling_windows.state_rows``:
+    the last max(GAME_WINDOWS) games plus every game in the longest day
+    window, with their running sums), so the cost follows the size of the
+    new slate. Returns the set of game dates that changed,
+    or ``None`` when a full rebuild was needed instead (first build, a
+    rewritten or compacted master, rows older than an entity's history,
+    or team games arriving after rows of their pitchers).
+    """
+    manifest = _read_manifest()
+    if manifest is None:
+        materialize()
+        return None
+
+    added, sources = {}, {}
+    for name, (finder, _, _, _) in ROLLED.items():
+        previous = manifest["sources"].get(finder.MASTER_CSV)
+        new_rows = _appended_rows(name, previous)
+        if new_rows is None:
+            print(f" {finder.MASTER_CSV} was rewritten — rebuilding the feature store...")
+            materialize()
+            return None
+        added[name] = new_rows
+        sources[finder.MASTER_CSV] = _source_state(finder.MASTER_CSV)
+
+    # Pitcher rows take their game from the team master (ingest.resolve_games), so a team
+    # game arriving after its pitchers' rows would change rows already stored
+    late = added["team_pitching"][["Date", "Team"]].drop_duplicates()
+    if len(late) and len(pd.read_feather(_table_path("pitcher_games"), columns=["Date", "Team"]).merge(late)):
+        print(" team_pitching: games arrived after their pitcher rows — rebuilding the feature store...")
+        materialize()
+        return None
+
+    if not any(len(df) for df in added.values()):
+        with open(MANIFEST, "w") as f:
+            json.dump({**manifest, "sources": sources}, f, indent=2)
+        return set()
+
+    tables, states, changed_dates = {}, {}, set()
+    for name, raw in added.items():
+        table = pd.read_feather(_table_path(name))
+        state = pd.read_feather(_state_path(name))
+        if raw.empty:
+            tables[name], states[name] = table, state
+            continue
+        _, key, clean, roll = ROLLED[name]
+        new = clean(raw).drop_duplicates(subset=[key, "Game_ID"])
+        new = new[~new.set_index([key, "Game_ID"]).index.isin(table.set_index([key, "Game_ID"]).index)]
+        if new.empty:
+            tables[name], states[name] = table, state
+            continue
+        touched = state[key].isin(new[key].unique())
+        seed = state[touched]
+
+        # A game older than an entity's latest known game would reorder its window
+        last_seen = seed.groupby(key, observed=True)["Date"].max()
+        if (new["Date"] < new[key].map(last_seen)).any():
+            print(f" {name}: rows arrived out of order — rebuilding the feature store...")
+            materialize()
+            return None
+
+        window = pd.concat([seed.assign(_new=False), new.assign(_new=True)], ignore_index=True)
+        window = roll(window.sort_values(_order(key), kind="stable").reset_index(drop=True))
+        rolled, window_state = _split(name, window)
+        fresh = rolled[window["_new"].to_numpy()][table.columns]
+        print(f" {name}: {len(fresh)} new row(s) across {fresh[key].nunique()} entit(ies)")
+
+        tables[name] = pd.concat([table, fresh], ignore_index=True).sort_values(_order(key), kind="stable")
+        states[name] = pd.concat([state[~touched], window_state], ignore_index=True)
+        changed_dates.update(fresh["Date"].unique())
+
+    # Starters are per team-game, so only the affected dates are re-picked
+    pitcher_games = tables["pitcher_games"]
+    starters = pd.read_feather(_table_path("starters"))
+    touched = pitcher_games["Date"].isin(changed_dates)
+    starters = pd.concat([starters[~starters["Date"].isin(changed_dates)], build_starters(pitcher_games[touched])])
+    tables["starters"] = starters.sort_values(STARTER_ORDER, kind="stable").reset_index(drop=True)
+
+    _write(tables, states, sources, changed_dates)
+    _loaded.clear()
+    _loaded.update(tables)
+    return {pd.Timestamp(d) for d in changed_dates}
+
+
+# === Query API
+_loaded = {}
+
+
+def changes_since(build_id, generation):
+    """``(build id, generation, game dates changed after ``generation``)`` of the up-to-date store.
+
+    The set is ``None`` when the store was fully rebuilt since ``build_id``
+    and ``generation`` were recorded, i.e. any date may have changed.
+    """
+    if not is_fresh():
+        update()
+    manifest = _read_manifest()
+    if manifest["build_id"] != build_id or manifest["rebuilt"] > generation:
+        return manifest["build_id"], manifest["generation"], None
+    changed = {pd.Timestamp(day) for day, gen in manifest["dates"].items() if gen > generation}
+    return manifest["build_id"], manifest["generation"], changed
+
+
+def load(name):
+    """Feature table ``name``; the store is rebuilt first if a master has changed."""
+    if name not in TABLES:
+        raise KeyError(f"Unknown feature table: {name}")
+    if name not in _loaded:
+        if not is_fresh():
+            print(" Feature store is stale — updating from the masters...")
+            update()
+        if name not in _loaded:
+            _loaded[name] = pd.read_feather(_table_path(name))
+    return _loaded[name]
+
+
+# === Point-in-time joins
+def asof_join(left, right, left_key, right_key, cols, found, rename=None):
+    """Attach to every ``left`` row the latest ``right`` row with the same key dated strictly before it.
+
+    One sorted ``merge_asof`` pass replaces a filter-sort-tail per row. The
+    boolean column ``found`` marks rows that had an earlier match; ``left``
+    keeps its order and index.
+    """
+    right = right[[right_key, "Date"] + cols].rename(columns={right_key: left_key, **(rename or {})})
+    if right[left_key].dtype != left[left_key].dtype:
+        # merge_asof needs identical key dtypes; store team codes are categorical
+        right[left_key] = right[left_key].astype(object)
+        left = left.assign(**{left_key: left[left_key].astype(object)})
+    right = right.dropna(subset=[left_key, "Date"]).assign(**{found: True})
+    left = left.assign(_row=np.arange(len(left)))
+    valid = left["Date"].notna()
+
+    joined = pd.merge_asof(
+        left[valid].sort_values("Date", kind="stable"),
+        right.sort_values("Date", kind="stable"),
+        on="Date", by=left_key, direction="backward", allow_exact_matches=False,
+    )
+    joined = pd.concat([joined, left[~valid]], ignore_index=True).sort_values("_row")
+    joined[found] = joined[found].eq(True)
+    joined.index = left.index
+    return joined.drop(columns="_row")
+
+
+def sp_forms(source="pitcher_games", full_window=False):
+    """Per-appearance starter form for as-of joins: ``Player_key, Date, SP_ERA_3g, SP_WHIP_3g, SP_IP``.
+
+    ``source="starters"`` keeps only starts; ``full_window`` blanks the stats
+    of rows whose window holds fewer than three appearances.
+    """
+    forms = load(source)[["Player_key", "Date", "N_3g", "SP_ERA_3g", "SP_WHIP_3g", "SP_IP_3g"]]
+    forms = forms.rename(columns={"SP_IP_3g": "SP_IP"})
+    if full_window:
+        forms = forms.copy()
+        forms.loc[forms["N_3g"] < WINDOW, ["SP_ERA_3g", "SP_WHIP_3g", "SP_IP"]] = np.nan
+    return forms
+
+
+def matchup_matrix(sides, forms):
+    """Runs-model inputs for every team-game side in one vectorized pass.
+
+    ``sides`` needs ``Date, Team, Opp, SP_key, Opp_SP_key, Home``; ``forms``
+    comes from ``sp_forms``. Each source is joined as of the day before the
+    game, and ``Found`` is true where all four had an earlier row.
+    """
+    sp_cols = ["SP_ERA_3g", "SP_WHIP_3g", "SP_IP"]
+    out = asof_join(sides, load("team_batting"), "Team", "Team", ["Runs_avg3", "OBP_avg3"], "Found_team")
+    out = asof_join(out, load("team_pitching"), "Opp", "Team", ["Team_ER_avg3", "Team_WHIP_avg3"], "Found_opp")
+    out = asof_join(out, forms, "SP_key", "Player_key", sp_cols, "Found_sp")
+    out = asof_join(out, forms, "Opp_SP_key", "Player_key", sp_cols, "Found_opp_sp",
+                    rename={c: f"Opp_{c}" for c in sp_cols})
+    found_cols = ["Found_team", "Found_opp", "Found_sp", "Found_opp_sp"]
+    out["Found"] = out[found_cols].all(axis=1)
+    return out.drop(columns=found_cols)
+
+
+def starter_keys(names, ids=None):
+    """``Player_key`` of schedule starters, taken from the Stathead spelling of their PlayerID when it is known.
+
+    ESPN and Stathead spell some names differently; the identity index maps
+    the ID back to the name the pitcher master uses. Starters without a
+    known ID fall back to their schedule name.
+    """
+    keys = ingest.player_keys(names)
+    if ids is None:
+        return keys
+    identity = PitcherIdentityIndex.load()
+    stathead = ids.map({pid: identity.display_name(int(pid)) for pid in ids.dropna().unique()})
+    return ingest.player_keys(stathead).fillna(keys)
+
+
+def schedule_matrix(schedule_df):
+    """Runs-model features for both sides of every scheduled game, home side first.
+
+    ``schedule_df`` is the ESPN schedule (``date``, ``home_team``,
+    ``away_team``, ``home_pitcher``, ``away_pitcher`` and, when matched,
+    ``home_pitcher_id``, ``away_pitcher_id``). Starter form may cover
+    fewer than three earlier appearances; sides missing a source, starter
+    innings or any feature value are dropped.
+    """
+    sides = []
+    for own, other in [("home", "away"), ("away", "home")]:
+        sides.append(pd.DataFrame({
+            "Game": np.arange(len(schedule_df)),
+            "Date": pd.to_datetime(schedule_df["date"]).to_numpy(),
+            "Team": schedule_df[f"{own}_team"].to_numpy(),
+            "Opp": schedule_df[f"{other}_team"].to_numpy(),
+            "SP": schedule_df[f"{own}_pitcher"].to_numpy(),
+            "Opp_SP": schedule_df[f"{other}_pitcher"].to_numpy(),
+            "SP_id": schedule_df.get(f"{own}_pitcher_id", pd.Series(pd.NA, index=schedule_df.index)).to_numpy(),
+            "Opp_SP_id": schedule_df.get(f"{other}_pitcher_id", pd.Series(pd.NA, index=schedule_df.index)).to_numpy(),
+            "Home": int(own == "home"),
+        }))
+    sides = pd.concat(sides, ignore_index=True)
+    sides = sides.sort_values(["Game", "Home"], ascending=[True, False], kind="stable").reset_index(drop=True)
+    sides["SP_key"] = starter_keys(sides["SP"], sides["SP_id"])
+    sides["Opp_SP_key"] = starter_keys(sides["Opp_SP"], sides["Opp_SP_id"])
+    sides = sides.drop(columns=["SP_id", "Opp_SP_id"])
+
+    out = matchup_matrix(sides, sp_forms())
+    keep = out["Found"] & out["SP_IP"].fillna(0).ne(0) & out["Opp_SP_IP"].fillna(0).ne(0)
+    keep &= out[RUNS_FEATURES].notna().all(axis=1)
+    return out[keep]
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Materialize the shared feature tables.")
+    arg_parser.add_argument("--full", action="store_true", help="rebuild every table instead of folding in new rows")
+    args = arg_parser.parse_args()
+
+    if args.full:
+        materialize()
+        changed = None
+    else:
+        changed = update()
+    if changed is None:
+        print(" Feature store rebuilt from the masters.")
+    else:
+        print(f" Feature store updated: {len(changed)} game date(s) changed.")
+    for name in TABLES:
+        print(f" {name}: {len(load(name))} rows → {_table_path(name)}")
@@ -0,0 +1,101 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+COMPILED_DIR = "models/compiled"
+# Node arrays of a compiled ensemble; every tree's nodes are stored back to back
+NODE_ARRAYS = ["feature", "threshold", "left", "right", "default_left", "value"]
+
+
+def compiled_dir(path):
+    """Where the compiled export of the model saved at ``path`` lives."""
+    return os.path.join(COMPILED_DIR, os.path.splitext(os.path.basename(path))[0])
+
+
+def signature(path):
+    # Content, not mtime: a checkout or cache restore can carry another model's timestamp
+    with open(path, "rb") as f:
+        return {"sha256": hashlib.sha256(f.read()).hexdigest()}
+
+
+class FlatModel:
+    """A tree ensemble (or linear model) compiled to flat NumPy arrays.
+
+    Node ``i`` splits on ``feature[i]`` at ``threshold[i]`` and continues at
+    ``left[i]`` or ``right[i]``; rows with a missing value follow
+    ``default_left[i]``. Leaves point back at themselves, so every row can
+    take ``depth`` steps through every tree at once. A prediction is ``base``
+    plus the leaf ``value`` of each tree, added tree by tree as sklearn and
+    XGBoost add them, divided by the number of trees for a forest. The arrays
+    are memory-mapped, and scoring needs neither sklearn nor XGBoost.
+    """
+
+    def __init__(self, directory, meta):
+        self.meta = meta
+        self.features = meta["features"]
+        self.classes_ = np.array(meta["classes"]) if meta.get("classes") is not None else None
+        arrays = NODE_ARRAYS + ["roots"] if meta["kind"] == "trees" else ["coef"]
+        for name in arrays:
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+
+    def _matrix(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[self.features]
+        # Trees were fit on float32 copies of the features, so splits compare in float32
+        return np.asarray(X, dtype=np.float32 if self.meta["kind"] == "trees" else np.float64)
+
+    def _leaves(self, X):
+        """Leaf reached in every tree: an ``(n_rows, n_trees)`` array of node indices."""
+        rows = np.arange(len(X))[:, None]
+        node = np.repeat(np.asarray(self.roots)[None, :], len(X), axis=0)
+        for _ in range(self.meta["depth"]):
+            x = X[rows, self.feature[node]]
+            if self.meta["comparison"] == "<=":
+                go_left = x <= self.threshold[node]
+            else:
+                go_left = x < self.threshold[node]
+            go_left = np.where(np.isnan(x), self.default_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def _raw(self, X):
+        X = self._matrix(X)
+        if self.meta["kind"] == "linear":
+            return X @ self.coef + self.meta["base"]
+        leaf_values = self.value[self._leaves(X)]
+        out = np.zeros((len(X),) + leaf_values.shape[2:], dtype=leaf_values.dtype)
+        out += np.asarray(self.meta["base"], dtype=leaf_values.dtype)
+        # Trees are added in order, as the libraries add them, so sums match to the last bit
+        for t in range(leaf_values.shape[1]):
+            out += leaf_values[:, t]
+        if self.meta["average"]:
+            out /= leaf_values.shape[1]
+        return out
+
+    def predict_proba(self, X):
+        if self.classes_ is None:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._raw(X)
+
+    def predict(self, X):
+        raw = self._raw(X)
+        if self.classes_ is not None:
+            return self.classes_.take(raw.argmax(axis=1))
+        return raw
+
+
+def load(path):
+    """The model saved at ``path``: its compiled export when that is current, else the pickled estimator."""
+    directory = compiled_dir(path)
+    meta_path = os.path.join(directory, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["source"] == signature(path):
+            return FlatModel(directory, meta)
+    print(f" {path}: no current compiled export — unpickling it (run models/compile_trees.py)")
+    # Only the fallback pays for importing joblib and the estimator's library
+    import joblib
+    return joblib.load(path)
@@ -0,0 +1,220 @@
+import io
+import os
+import sys
+import glob
+import hashlib
+import argparse
+import pandas as pd
+from pathlib import Path
+from functools import lru_cache
+from unidecode import unidecode
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrape_logic import masters
+
+INGEST_DIR = "data/index/ingest"
+TEAM_MAP_CSV = "data/team_name_map.csv"
+# Bumped when parse() output changes, so cached frames are re-parsed
+INGEST_FORMAT = 3
+
+# Declared schema of every Stathead master. Columns not listed are kept as text.
+SCHEMAS = {
+    "pitcher_games": {
+        "master": masters.PITCHER_MASTER_CSV,
+        "dedupe": masters.PITCHER_DEDUPE_COLS,
+        "home_col": "Unnamed: 5",
+        "text": ["Player", "Age", "Result", "App,Dec", "Pos"],
+        "player": "Player",
+        "outs": "IP",
+        "counts": ["Rk", "H", "R", "ER", "UER", "HR", "BB", "IBB", "SO", "HBP", "BK", "WP", "BF", "BR"],
+        "rates": [],
+    },
+    "team_batting": {
+        "master": masters.TEAM_BATTING_MASTER_CSV,
+        "dedupe": masters.TEAM_BATTING_DEDUPE_COLS,
+        "home_col": "Unnamed: 3",
+        "text": ["Result"],
+        "player": None,
+        "outs": None,
+        "counts": ["Rk", "PA", "AB", "R", "H", "1B", "2B", "3B", "HR", "RBI", "SB", "CS", "BB", "SO",
+                   "TB", "GIDP", "HBP", "SH", "SF", "IBB"],
+        "rates": ["BA", "OBP", "SLG", "OPS"],
+    },
+    "team_pitching": {
+        "master": masters.TEAM_PITCHING_MASTER_CSV,
+        "dedupe": masters.TEAM_PITCHING_DEDUPE_COLS,
+        "home_col": "Unnamed: 3",
+        "text": ["Result"],
+        "player": None,
+        "outs": "IP",
+        "counts": ["Rk", "H", "R", "ER", "UER", "HR", "BB", "IBB", "SO", "HBP", "BK", "WP", "BF", "BR"],
+        "rates": [],
+    },
+}
+
+
+# === Innings
+def innings(outs):
+    """Outs → innings as a float (17 → 5⅔)."""
+    return outs // 3 + outs % 3 / 3.0
+
+
+def ip_notation(outs):
+    """Outs → box-score IP notation (17 → 5.2), the value the K model was trained on."""
+    return outs // 3 + outs % 3 / 10
+
+
+def _ip_to_outs(values):
+    ip_parts = values.str.extract(r"^\s*(?P<whole>\d+)(?:\.(?P<frac>\d))?")
+    return pd.to_numeric(ip_parts["whole"]) * 3 + pd.to_numeric(ip_parts["frac"]).fillna(0)
+
+
+# === Player keys
+@lru_cache(maxsize=None)
+def player_key(name):
+    """Canonical join key of a player name (``"José Buttó "`` → ``"jose butto"``), memoized per name."""
+    return unidecode(str(name)).lower().strip()
+
+
+def player_keys(names):
+    """``player_key`` of every name in a Series, normalizing each distinct name once; blanks stay NaN."""
+    return names.map({name: player_key(name) for name in names.dropna().unique()})
+
+
+# === Game keys
+def _team_number(code):
+    # Base-37 value of a team code, so IDs do not depend on the team map's order
+    return sum((int(ch, 36) + 1) * 37 ** i for i, ch in enumerate(reversed(code)))
+
+
+def game_ids(df):
+    """Integer ID of each row's game from its date, home team, away team and game number.
+
+    Every row of one game shares the ID in every master (both teams, all
+    pitchers), and doubleheader games get distinct IDs.
+    """
+    team, opp = df["Team"].astype(object), df["Opp"].astype(object)
+    numbers = {code: _team_number(code) for code in set(team.dropna()) | set(opp.dropna())}
+    home = df["Home"] == 1
+    home_team = team.where(home, opp).map(numbers).astype("Int64")
+    away_team = opp.where(home, team).map(numbers).astype("Int64")
+    day = (df["Date"].dt.year * 10000 + df["Date"].dt.month * 100 + df["Date"].dt.day).astype("Int64")
+    return ((day * 100000 + home_team) * 100000 + away_team) * 10 + df["Game"].astype("Int64")
+
+
+def resolve_games(df, team_games):
+    """Take ``Game``, ``Home`` and ``Game_ID`` from the team's game in ``team_games`` (a parsed team master).
+
+    The pitcher scraper strips the ``"(2)"`` doubleheader suffix and many
+    pitcher rows lack the ``@`` away marker, so their own game fields are
+    unreliable. Rows are matched on date, team and result line; rows
+    without a unique match keep their parsed values.
+    """
+    keys, fields = ["Date", "Team", "Result"], ["Game", "Home", "Game_ID"]
+    games = team_games.drop_duplicates(subset=keys, keep=False)[keys + fields]
+    matched = df[keys].merge(games, on=keys, how="left").set_axis(df.index)
+    found = matched["Game_ID"].notna().to_numpy()
+    df = df.copy()
+    for col in fields:
+        df.loc[found, col] = matched.loc[found, col].astype(df[col].dtype)
+    return df
+
+
+# === Column types
+def team_dtype():
+    codes = pd.read_csv(TEAM_MAP_CSV, dtype=str)["team_id"].dropna()
+    return pd.CategoricalDtype(sorted(codes.unique()))
+
+
+def _teams(values, dtype):
+    unknown = set(values.dropna().unique()) - set(dtype.categories)
+    if unknown:
+        raise ValueError(f"Unknown team code(s) {sorted(unknown)}; add them to {TEAM_MAP_CSV}")
+    return values.astype(dtype)
+
+
+def _count(values):
+    # Box-score counts fit int16; a column with blanks stays float so NaN survives
+    numbers = pd.to_numeric(values, errors="coerce")
+    return numbers.astype("int16") if numbers.notna().all() else numbers.astype("float32")
+
+
+# === Parsing
+def parse(name, raw):
+    """Type one raw master frame (all columns read as text) with the ``name`` schema."""
+    schema = SCHEMAS[name]
+    raw = raw.copy()
+    out = pd.DataFrame(index=raw.index)
+
+    # "2025-06-04 (2)" → Date 2025-06-04, Game 2
+    dates = raw.pop("Date").str.extract(r"^(?P<day>\d{4}-\d{2}-\d{2})(?:\s*\((?P<game>\d)\))?")
+    out["Date"] = pd.to_datetime(dates["day"], errors="coerce")
+    out["Game"] = pd.to_numeric(dates["game"]).fillna(1).astype("int8")
+    out["Home"] = raw.pop(schema["home_col"]).ne("@").astype("int8")
+
+    teams = team_dtype()
+    out["Team"] = _teams(raw.pop("Team"), teams)
+    out["Opp"] = _teams(raw.pop("Opp"), teams)
+    out.insert(0, "Game_ID", game_ids(out))
+    for col in schema["text"]:
+        out[col] = raw.pop(col)
+    if schema["player"]:
+        out[f"{schema['player']}_key"] = player_keys(out[schema["player"]])
+    if schema["outs"]:
+        outs = _ip_to_outs(raw.pop(schema["outs"]))
+        out["IP_outs"] = outs.astype("int16") if outs.notna().all() else outs.astype("float32")
+    for col in schema["counts"]:
+        out[col] = _count(raw.pop(col))
+    for col in schema["rates"]:
+        out[col] = pd.to_numeric(raw.pop(col), errors="coerce")
+
+    # Anything the schema does not know yet is passed through untouched
+    return pd.concat([out, raw], axis=1)
+
+
+def dedupe(name, df):
+    """Drop repeated games, keyed on the scraper's dedupe columns in their typed form."""
+    renamed = {"Date": ["Date", "Game"], "IP": ["IP_outs"]}
+    cols = [c for col in SCHEMAS[name]["dedupe"] for c in renamed.get(col, [col])]
+    return df[~df.duplicated(subset=cols)].reset_index(drop=True)
+
+
+def read_raw(source):
+    """A master CSV (path or bytes buffer) with every column as text."""
+    return pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[""])
+
+
+# === Cached loads
+def load(name):
+    """Typed, deduplicated master ``name``, parsed once per version of the CSV.
+
+    The parsed frame is cached as Feather under data/index/ingest/, keyed on
+    the SHA-256 of the master and INGEST_FORMAT, so unchanged masters are
+    never re-parsed.
+    """
+    path = SCHEMAS[name]["master"]
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    cache = os.path.join(INGEST_DIR, f"{name}-v{INGEST_FORMAT}-{digest[:16]}.feather")
+    if os.path.exists(cache):
+        return pd.read_feather(cache)
+
+    df = dedupe(name, parse(name, read_raw(io.BytesIO(data))))
+    os.makedirs(INGEST_DIR, exist_ok=True)
+    for old in glob.glob(os.path.join(INGEST_DIR, f"{name}-*.feather")):
+        os.remove(old)
+    df.to_feather(cache)
+    return df
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Parse the Stathead masters into typed, cached frames.")
+    arg_parser.add_argument("names", nargs="*", default=list(SCHEMAS), help="masters to parse (default: all)")
+    args = arg_parser.parse_args()
+
+    for name in args.names:
+        raw_mb = read_raw(SCHEMAS[name]["master"]).memory_usage(deep=True).sum() / 1e6
+        df = load(name)
+        typed_mb = df.memory_usage(deep=True).sum() / 1e6
+        print(f" {name}: {len(df)} rows, {raw_mb:.2f} MB as text → {typed_mb:.2f} MB typed")
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+
+class PitcherLogIndex:
+    """Pitcher game logs grouped into contiguous per-pitcher slices sorted by date.
+
+    Rows are reordered once by (key, date); ``offsets[i]:offsets[i + 1]`` is
+    the slice of the i-th pitcher. A lookup is a dict hit for the slice plus
+    a binary search on its dates, so "last k appearances before d" costs
+    O(log n) however many seasons are loaded. Rows with no key or date are
+    left out.
+    """
+
+    def __init__(self, df, key="Player_key", date_col="Date"):
+        df = df.dropna(subset=[key, date_col])
+        order = np.lexsort((df[date_col].to_numpy(), df[key].to_numpy()))
+        self.frame = df.iloc[order].reset_index(drop=True)
+        self.key = key
+        self.dates = self.frame[date_col].to_numpy(dtype="datetime64[ns]")
+
+        keys = self.frame[key].to_numpy()
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=int)
+        self.offsets = np.r_[starts, len(keys)]
+        self.slots = {k: i for i, k in enumerate(keys[starts])}
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, value):
+        return value in self.slots
+
+    def column(self, name):
+        """Whole-table NumPy array of ``name`` in index order (converted once)."""
+        if name not in self._columns:
+            self._columns[name] = self.frame[name].to_numpy()
+        return self._columns[name]
+
+    def span(self, value, before=None, k=None):
+        """``(start, stop)`` rows of ``value``'s log, limited to games before ``before`` and to the last ``k``."""
+        slot = self.slots.get(value)
+        if slot is None:
+            return 0, 0
+        start, stop = self.offsets[slot], self.offsets[slot + 1]
+        if before is not None:
+            stop = start + np.searchsorted(self.dates[start:stop], np.datetime64(before, "ns"), side="left")
+        if k is not None:
+            start = max(start, stop - k)
+        return start, stop
+
+    def last_before(self, value, before, k, columns):
+        """Arrays of ``columns`` for ``value``'s last ``k`` appearances dated strictly before ``before``, oldest first."""
+        start, stop = self.span(value, before, k)
+        return {name: self.column(name)[start:stop] for name in columns}
+
+    def log(self, value):
+        """``value``'s full game log as a DataFrame, oldest first."""
+        start, stop = self.span(value)
+        return self.frame.iloc[start:stop]
@@ -1,43 +1,43 @@
+import sys
 import pandas as pd
 import numpy as np
-import joblib
 import os
 from datetime import datetime
+from pathlib import Path
 from unidecode import unidecode
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pipeline_logic import feature_store, flat_trees
+from pipeline_logic.pitcher_log import PitcherLogIndex
+
 # === Load model
-model = joblib.load("models/pitcher_k_model.joblib")
+model = flat_trees.load("models/pitcher_k_model.joblib")
 
 # === Load input files
 games_df = pd.read_csv("data/scheduled_games_and_starters_with_id.csv", parse_dates=["date"])
+pitcher_logs = PitcherLogIndex(feature_store.load("pitcher_games"))
 
-pitching_df = pd.read_csv("data/Stathead_2025_Pitcher_Master.csv")
-pitching_df["Date"] = pd.to_datetime(pitching_df["Date"], errors="coerce")
-pitching_df["Player"] = pitching_df["Player"].apply(lambda x: unidecode(str(x)).strip())
-
-# === Normalize pitching stats
-for col in ["SO", "IP", "ER", "BB", "BF"]:
-    pitching_df[col] = pd.to_numeric(pitching_df[col], errors="coerce")
-pitching_df["Home"] = pitching_df["Unnamed: 5"].apply(lambda x: 0 if x == "@" else 1)
+K_COLUMNS = ["N_3g", "K_last3", "IP_last3", "ER_last3", "BB_last3", "BF_last3"]
 
 # === Loop through BOTH home and away starters
 pred_rows = []
 
-def process_pitcher(pitcher_name, game_date, team, opponent, is_home):
+def process_pitcher(pitcher_name, pitcher_key, game_date, team, opponent, is_home):
     pitcher_name_clean = unidecode(str(pitcher_name)).strip()
-    history = pitching_df[(pitching_df["Player"] == pitcher_name_clean) & (pitching_df["Date"] < game_date)]
-    history = history.sort_values("Date").tail(3)
+    # Rolling columns on the latest appearance already cover the three before it
+    history = pitcher_logs.last_before(pitcher_key, game_date, 1, K_COLUMNS)
+    appearances = int(history["N_3g"][-1]) if len(history["N_3g"]) else 0
 
-    if len(history) < 3:
-        print(f" Skipping {pitcher_name_clean}: only {len(history)} appearances before {game_date.date()}")
+    if appearances < 3:
+        print(f" Skipping {pitcher_name_clean}: only {appearances} appearances before {game_date.date()}")
         return
 
     features = {
-        "K_last3": history["SO"].mean(),
-        "IP_last3": history["IP"].mean(),
-        "ER_last3": history["ER"].mean(),
-        "BB_last3": history["BB"].mean(),
-        "BF_last3": history["BF"].mean(),
+        "K_last3": history["K_last3"][-1],
+        "IP_last3": history["IP_last3"][-1],
+        "ER_last3": history["ER_last3"][-1],
+        "BB_last3": history["BB_last3"][-1],
+        "BF_last3": history["BF_last3"][-1],
         "Home": 1 if is_home else 0
     }
 
@@ -54,12 +54,17 @@ def process_pitcher(pitcher_name, game_date, team, opponent, is_home):
     print(f" Predicted Ks for {pitcher_name_clean}: {round(predicted_ks, 2)}")
 
 # === Process all games
+# Starters are looked up by the Stathead spelling of their PlayerID when it is known
+for side in ["away", "home"]:
+    games_df[f"{side}_key"] = feature_store.starter_keys(games_df[f"{side}_pitcher"], games_df.get(f"{side}_pitcher_id"))
+
 for _, row in games_df.iterrows():
     date = row["date"]
 
     # Away starter
     process_pitcher(
         pitcher_name=row["away_pitcher"],
+        pitcher_key=row["away_key"],
         game_date=date,
         team=row["away_team"],
         opponent=row["home_team"],
@@ -69,6 +74,7 @@ for _, row in games_df.iterrows():
     # Home starter
     process_pitcher(
         pitcher_name=row["home_pitcher"],
+        pitcher_key=row["home_key"],
         game_date=date,
         team=row["home_team"],
         opponent=row["away_team"],
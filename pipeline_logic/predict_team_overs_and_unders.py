@@ -1,118 +1,75 @@
+import sys
+import argparse
 import pandas as pd
-import joblib
 import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pipeline_logic import feature_store, flat_trees
+
+arg_parser = argparse.ArgumentParser(description="Predict team runs and over/under probabilities.")
+arg_parser.add_argument("--workers", type=int, default=1, help="score the threshold classifiers on this many threads")
+args = arg_parser.parse_args()
 
 # === Load models and data ===
-regressor = joblib.load("models/final_team_model.joblib")
+regressor = flat_trees.load("models/final_team_model.joblib")
 schedule_df = pd.read_csv("data/scheduled_games_and_starters_with_id.csv")
-pitcher_df = pd.read_csv("data/Stathead_2025_Pitcher_Master.csv")
-historical_df = pd.read_csv("data/team_run_prediction_dataset.csv")
 
 # Clean and parse dates
 schedule_df["date"] = pd.to_datetime(schedule_df["date"])
-pitcher_df["Date"] = pitcher_df["Date"].astype(str).str.extract(r"^([0-9]{4}-[0-9]{2}-[0-9]{2})")[0]
-pitcher_df["Date"] = pd.to_datetime(pitcher_df["Date"])
-historical_df["Date"] = pd.to_datetime(historical_df["Date"])
-
-# Convert innings pitched to float
-ip_parts = pitcher_df["IP"].astype(str).str.extract(r"(?P<whole>\d+)(?:\.(?P<frac>\d))?")
-pitcher_df["IP_float"] = ip_parts["whole"].astype(float) + ip_parts["frac"].fillna(0).astype(float) / 3.0
-
-# === Rolling SP stats function ===
-def get_sp_rolling_stats(pitcher_name, game_date):
-    df = pitcher_df[pitcher_df["Player"] == pitcher_name]
-    df = df[df["Date"] < game_date].sort_values("Date").tail(3)
-    if df.empty:
-        return None
-    ip_total = df["IP_float"].sum()
-    er_total = pd.to_numeric(df["ER"], errors="coerce").fillna(0).sum()
-    h_total = pd.to_numeric(df["H"], errors="coerce").fillna(0).sum()
-    bb_total = pd.to_numeric(df["BB"], errors="coerce").fillna(0).sum()
-    if ip_total == 0:
-        return None
-    return {
-        "SP_ERA_3g": (er_total * 9) / ip_total,
-        "SP_WHIP_3g": (h_total + bb_total) / ip_total,
-        "SP_IP": ip_total
-    }
 
 # === Thresholds and classifiers ===
 thresholds = [3.5, 4.5, 5.5, 6.5]
 classifiers = {
-    t: joblib.load(f"models/classifier_over_{str(t).replace('.', '_')}.joblib")
+    t: flat_trees.load(f"models/classifier_over_{str(t).replace('.', '_')}.joblib")
     for t in thresholds
 }
 
-# === Prediction loop ===
-prediction_rows = []
-
-for _, game in schedule_df.iterrows():
-    game_date = game["date"]
-
-    for is_home in [True, False]:
-        team = game["home_team"] if is_home else game["away_team"]
-        opp = game["away_team"] if is_home else game["home_team"]
-        sp_name = game["home_pitcher"] if is_home else game["away_pitcher"]
-        opp_sp_name = game["away_pitcher"] if is_home else game["home_pitcher"]
-
-        # Pull rolling team stats
-        team_row = historical_df[
-            (historical_df["Team"] == team) & (historical_df["Date"] < game_date)
-        ].sort_values("Date").tail(1)
 
-        opp_row = historical_df[
-            (historical_df["Team"] == opp) & (historical_df["Date"] < game_date)
-        ].sort_values("Date").tail(1)
 
-        sp_stats = get_sp_rolling_stats(sp_name, game_date)
-        opp_sp_stats = get_sp_rolling_stats(opp_sp_name, game_date)
+# === Threshold scoring: one predict_proba per classifier over every row
+def score_threshold(clf, X):
+    proba = clf.predict_proba(X)
+    # Same label predict() would give, without a second pass over the trees
+    labels = clf.classes_.take(proba.argmax(axis=1))
+    return labels, proba[:, list(clf.classes_).index(1)]  # Probability of Over
 
-        if team_row.empty or opp_row.empty or sp_stats is None or opp_sp_stats is None:
-            continue
 
-        features = {
-            "Runs_avg3": team_row["Runs_avg3"].values[0],
-            "OBP_avg3": team_row["OBP_avg3"].values[0],
-            "Team_ER_avg3": opp_row["Team_ER_avg3"].values[0],
-            "Team_WHIP_avg3": opp_row["Team_WHIP_avg3"].values[0],
-            "SP_ERA_3g": sp_stats["SP_ERA_3g"],
-            "SP_WHIP_3g": sp_stats["SP_WHIP_3g"],
-            "SP_IP": sp_stats["SP_IP"],
-            "Opp_SP_ERA_3g": opp_sp_stats["SP_ERA_3g"],
-            "Opp_SP_WHIP_3g": opp_sp_stats["SP_WHIP_3g"],
-            "Opp_SP_IP": opp_sp_stats["SP_IP"],
-            "Home": 1 if is_home else 0
-        }
+def score_thresholds(X, workers=1):
+    if workers > 1:
+        # Tree scoring (compiled NumPy or the tree library) releases the GIL, so threads overlap
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {t: pool.submit(score_threshold, classifiers[t], X) for t in thresholds}
+            return {t: f.result() for t, f in futures.items()}
+    return {t: score_threshold(classifiers[t], X) for t in thresholds}
 
-        X_pred = pd.DataFrame([features])
-        predicted_runs = regressor.predict(X_pred)[0]
 
-        row = {
-            "date": game_date.date(),
-            "team": team,
-            "opponent": opp,
-            "home": features["Home"],
-            "starting_pitcher": sp_name,
-            "opponent_pitcher": opp_sp_name,
-            "predicted_runs": round(predicted_runs, 2)
-        }
+# === Feature matrix for both sides of every game
+features = feature_store.schedule_matrix(schedule_df)
+X_pred = features[feature_store.RUNS_FEATURES]
 
-        # Add classifier predictions for each threshold
-        for t in thresholds:
-            clf = classifiers[t]
-            prob = clf.predict_proba(X_pred)[0][1]  # Probability of Over
-            label = clf.predict(X_pred)[0]
-            t_str = str(t).replace(".", "_")
-            row[f"Over_{t_str}"] = int(label)
-            row[f"Over_{t_str}_Prob"] = round(prob, 3)
-            row[f"Under_{t_str}_Prob"] = round(1 - prob, 3)
+pred_df = pd.DataFrame({
+    "date": features["Date"].dt.date,
+    "team": features["Team"],
+    "opponent": features["Opp"],
+    "home": features["Home"],
+    "starting_pitcher": features["SP"],
+    "opponent_pitcher": features["Opp_SP"],
+    "predicted_runs": np.round(regressor.predict(X_pred), 2) if len(X_pred) else []
+})
 
-        prediction_rows.append(row)
+# Add classifier predictions for each threshold
+if len(X_pred):
+    for t, (labels, prob) in score_thresholds(X_pred, args.workers).items():
+        t_str = str(t).replace(".", "_")
+        pred_df[f"Over_{t_str}"] = labels.astype(int)
+        pred_df[f"Over_{t_str}_Prob"] = np.round(prob, 3)
+        pred_df[f"Under_{t_str}_Prob"] = np.round(1 - prob, 3)
 
 # === Output predictions
 os.makedirs("outputs", exist_ok=True)
-pred_df = pd.DataFrame(prediction_rows)
 pred_df.to_csv("outputs/team_predictions.csv", index=False)
 print(" Saved full team predictions to outputs/team_predictions.csv")
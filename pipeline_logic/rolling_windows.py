@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+GAME_WINDOWS = (3, 5, 10)
+DAY_WINDOWS = (7,)
+EWM_SPANS = (5,)
+
+# Window labels, in column order: "3g", "5g", "10g", "season", "7d", "ewm5"
+LABELS = [f"{k}g" for k in GAME_WINDOWS] + ["season"] + [f"{d}d" for d in DAY_WINDOWS] + [f"ewm{s}" for s in EWM_SPANS]
+
+# Per-row running state carried between incremental updates
+CS, BASE, EWM = "_cs_{}", "_base_{}", "_ewm{}_{}"
+
+
+def state_columns(components):
+    cols = [CS.format(c) for c in components] + [BASE.format(c) for c in components]
+    return cols + [EWM.format(s, c) for s in EWM_SPANS for c in components]
+
+
+def _where(frame, rows, other):
+    """``frame`` on the flagged rows, ``other`` elsewhere."""
+    return frame.where(np.broadcast_to(rows[:, None], frame.shape), other)
+
+
+def window_sums(df, key, components):
+    """Every window of every component in one grouped cumulative-sum pass.
+
+    ``df`` is sorted by ``key`` then ``Date`` and ``components`` hold whole
+    numbers (outs, runs, counts), so running totals are exact and a window
+    is a difference of two of them. ``"_n"`` counts games. Returns
+    ``(sums, state)``: ``sums[(component, label)]`` is the window total
+    (the per-game weighted mean for ``ewm`` labels), ``state`` the running
+    columns to carry into the next update.
+
+    Rows with ``_new == False`` are seed rows from a previous build: they
+    supply their stored running columns instead of being recomputed.
+    """
+    components = list(components) + ["_n"]
+    new = df["_new"].to_numpy() if "_new" in df else np.ones(len(df), dtype=bool)
+    seed = ~new
+    x = df.reindex(columns=components).assign(_n=1.0).astype(float).fillna(0)
+    groups = df[key]
+    codes = pd.factorize(groups)[0]
+
+    # Running totals: seeds keep theirs, new rows continue from the last seed of their key
+    stored = df.reindex(columns=state_columns(components))
+    offset = _where(stored[[CS.format(c) for c in components]].set_axis(components, axis=1), seed, np.nan)
+    offset = offset.groupby(codes).ffill().fillna(0)
+    cs = _where(_where(x, new, 0).groupby(codes).cumsum() + offset, new, offset)
+    first_before = (cs - x).groupby(codes).transform("first")
+
+    sums = {}
+    for k in GAME_WINDOWS:
+        lagged = cs.groupby(codes).shift(k)
+        # Fewer than k earlier games anywhere in history: the window is everything so far
+        sums.update(_label(cs - lagged.fillna(first_before), f"{k}g"))
+
+    # Season to date: totals since the row before the key's first game of the year
+    season = df["Date"].dt.year.to_numpy()
+    prev_code = np.r_[-1, codes[:-1]]
+    prev_season = np.r_[-1, season[:-1]]
+    starts = new & ((prev_code != codes) | (prev_season != season))
+    base = _where(cs - x, starts, np.nan)
+    base = _where(base, new, stored[[BASE.format(c) for c in components]].set_axis(components, axis=1))
+    base = base.groupby(codes).ffill()
+    sums.update(_label(cs - base, "season"))
+
+    # Calendar windows: totals since the last game at least `days` before the row
+    day = df["Date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    position = codes.astype(np.int64) * (1 << 32) + day
+    for days in DAY_WINDOWS:
+        before = np.searchsorted(position, position - days, side="right") - 1
+        same = (before >= 0) & (codes[np.maximum(before, 0)] == codes)
+        baseline = cs.to_numpy()[np.maximum(before, 0)]
+        baseline = np.where(same[:, None], baseline, first_before.to_numpy())
+        sums.update(_label(cs - baseline, f"{days}d"))
+
+    # Exponentially weighted per-game means, continued from each key's last seed
+    last_seed = seed & ~((np.r_[codes[1:], -1] == codes) & np.r_[seed[1:], False])
+    for span in EWM_SPANS:
+        seeded = stored[[EWM.format(span, c) for c in components]].set_axis(components, axis=1)
+        rows = new | last_seed
+        values = _where(x, new, seeded)[rows]
+        means = values.groupby(codes[rows]).ewm(span=span, adjust=False).mean().reset_index(level=0, drop=True)
+        sums.update(_label(_where(means.reindex(df.index), new, seeded), f"ewm{span}"))
+
+    state = pd.concat(
+        [cs.add_prefix("_cs_"), base.add_prefix("_base_")]
+        + [sums_frame(sums, components, f"ewm{s}").add_prefix(f"_ewm{s}_") for s in EWM_SPANS],
+        axis=1,
+    )
+    return sums, state
+
+
+def _label(frame, label):
+    return {(c, label): frame[c] for c in frame.columns}
+
+
+def per_game(sums, component, label):
+    """Per-game average of ``component`` over the ``label`` window."""
+    total = sums[(component, label)]
+    return total if label.startswith("ewm") else total / sums[("_n", label)]
+
+
+def full(sums, label):
+    """Rows whose ``label`` window holds all of its games (always true for non-game windows)."""
+    if not label.endswith("g"):
+        return pd.Series(True, index=sums[("_n", label)].index)
+    return sums[("_n", label)] >= int(label[:-1])
+
+
+def sums_frame(sums, components, label):
+    return pd.DataFrame({c: sums[(c, label)] for c in components})
+
+
+def state_rows(df, key):
+    """Rows a later update needs as seeds: the last max(GAME_WINDOWS) games of each
+    key plus every game inside its longest calendar window."""
+    groups = df.groupby(key, sort=False, observed=True)
+    recent = groups.cumcount(ascending=False) < max(GAME_WINDOWS)
+    last_date = groups["Date"].transform("max")
+    in_days = df["Date"] > last_date - pd.Timedelta(days=max(DAY_WINDOWS))
+    return df[recent | in_days]
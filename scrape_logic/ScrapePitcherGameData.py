@@ -1,124 +1,105 @@
-import os
-import time
-import datetime
+import sys
+import argparse
 import pandas as pd
-from dotenv import load_dotenv
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
 from pathlib import Path
 
-# === Load credentials
-load_dotenv(dotenv_path=Path("utilities/.env"))
-USERNAME = os.getenv("STATHEAD_USERNAME")
-PASSWORD = os.getenv("STATHEAD_PASSWORD")
-if not USERNAME or not PASSWORD:
-    raise ValueError(" STATHEAD_USERNAME or STATHEAD_PASSWORD is not set.")
-
-# === Setup headless browser
-options = Options()
-options.add_argument("--headless=new")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
-# === Paths
-today = datetime.date.today()
-timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-date_dir = f"data/archive/{today.isoformat()}"
-os.makedirs(date_dir, exist_ok=True)
-
-output_csv = f"{date_dir}/stathead_pitching_scrape_{timestamp}.csv"
-master_csv = "data/Stathead_2025_Pitcher_Master.csv"
-
-# === Scrape recent 5 days
-all_rows = []
-page_num = 0
-
-try:
-    print(" Logging in and starting scrape...")
-    driver.get("https://stathead.com/users/login.cgi")
-    time.sleep(2)
-    driver.find_element(By.NAME, "username").send_keys(USERNAME)
-    driver.find_element(By.NAME, "password").send_keys(PASSWORD)
-    driver.find_element(By.NAME, "password").send_keys(Keys.RETURN)
-    time.sleep(3)
-
-    driver.get(
-        "https://stathead.com/baseball/player-pitching-game-finder.cgi"
-        "?request=1&match=player_game&order_by_asc=0&order_by=date"
-        "&timeframe=last_n_days&previous_days=5"
-        "&comp_type=reg&team_game_min=1&team_game_max=165"
-        "&player_game_min=1&player_game_max=9999"
-        "&is_pitcher=1&role=anyGS"
-    )
-    time.sleep(5)
-
-    while True:
-        page_num += 1
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrape_logic.stathead_http import open_session
+from scrape_logic.stats_table import parse_stats_table
+from scrape_logic import archive_store, masters, page_cache
+from scrape_logic.master_table import MasterTable
+from scrape_logic.watermark import days_to_fetch
+
+NAME = "pitcher"
+FINDER_URL = (
+    "https://stathead.com/baseball/player-pitching-game-finder.cgi"
+    "?request=1&match=player_game&order_by_asc=0&order_by=date"
+    "&timeframe=last_n_days&previous_days={days}"
+    "&comp_type=reg&team_game_min=1&team_game_max=165"
+    "&player_game_min=1&player_game_max=9999"
+    "&is_pitcher=1&role=anyGS"
+)
+ARCHIVE_SOURCE = "stathead_pitching_scrape"
+MASTER_CSV = masters.PITCHER_MASTER_CSV
+DEDUPE_COLS = masters.PITCHER_DEDUPE_COLS
+
+
+# === Parse one result page
+def parse_page(html):
+    #  Repeated header rows are skipped and the @ column kept as "Unnamed: 5";
+    #  the Date is normalized (remove things like " (2)")
+    return parse_stats_table(html, normalize_dates=True)
+
+
+# === Parse result pages, stopping once a page is already in the master
+def collect(pages, master=None):
+    all_rows = []
+    for page_num, html in enumerate(pages, start=1):
         print(f" Scraping page {page_num}...")
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        table = soup.select_one("table.stats_table")
-        if not table:
+        df = parse_page(html)
+        if df is None:
             print(" Table not found.")
             break
+        all_rows.append(df)
+        print(f" Page {page_num}: {len(df)} clean rows")
+
+        # Results are newest-first, so a fully known page means the rest are too
+        if master is not None and master.is_known(df):
+            print(" Page holds only rows already in the master — stopping early.")
+            pages.close()
+            break
 
-        df = pd.read_html(str(table))[0]
+    if not all_rows:
+        return None
+    return pd.concat(all_rows, ignore_index=True)
 
-        #  Remove repeated headers mid-table
-        df = df[df["Rk"].astype(str).str.lower() != "rk"].reset_index(drop=True)
 
-        #  Drop Unnamed columns that can cause column shift
-        df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+# === Scrape pitcher game logs since the master watermark (raw pages go to the cache)
+def scrape(session):
+    days = days_to_fetch(MASTER_CSV)
+    master = MasterTable(MASTER_CSV, DEDUPE_COLS)
+    print(f" Requesting the last {days} day(s)...")
 
-        #  Normalize the Date (remove things like " (2)")
-        df["Date"] = df["Date"].astype(str).str.extract(r"(\d{4}-\d{2}-\d{2})")
+    url = FINDER_URL.format(days=days)
+    return collect(page_cache.recording(NAME, session.iter_pages(url), url=url), master)
 
-        all_rows.append(df)
-        print(f" Page {page_num}: {len(df)} clean rows")
 
-        try:
-            next_btn = driver.find_element(By.CSS_SELECTOR, "div.prevnext a.button2.next")
-            href = next_btn.get_attribute("href")
-            if not href:
-                break
-            driver.get(href)
-            time.sleep(5)
-        except:
-            break
+# === Re-parse a day's cached pages with no browser and no network
+def replay(day):
+    print(f" Replaying cached {NAME} pages from {day}...")
+    return collect(page_cache.iter_pages(NAME, day))
 
-finally:
-    print("🧹 Closing browser...")
-    driver.quit()
 
 # === Process scraped rows
-if all_rows:
-    scraped_df = pd.concat(all_rows, ignore_index=True)
+def save(scraped_df, day=None):
+    if scraped_df is None:
+        print(" No data collected.")
+        return
 
     # Optional: drop rows missing critical info
-    scraped_df = scraped_df.dropna(subset=["Player", "Date", "Team", "IP", "Result"])
-
-    scraped_df.to_csv(output_csv, index=False)
-    print(f" Scraped {len(scraped_df)} rows to {output_csv}")
-
-    if os.path.exists(master_csv):
-        master_df = pd.read_csv(master_csv)
-        before = len(master_df)
-        combined = pd.concat([master_df, scraped_df], ignore_index=True)
-        combined.drop_duplicates(subset=["Player", "Date", "Team", "IP", "Result"], inplace=True)
-        after = len(combined)
-        new_rows = after - before
-
-        combined.to_csv(master_csv, index=False)
-        print(f" Master file updated: {after} total rows")
-        print(f" Appended {new_rows} new row(s)")
+    scraped_df = scraped_df.dropna(subset=DEDUPE_COLS)
+
+    snapshot = archive_store.put_frame(ARCHIVE_SOURCE, scraped_df, day=day)
+    print(f" Scraped {len(scraped_df)} rows to archive snapshot {snapshot['sha256'][:12]} ({snapshot['day']})")
+
+    master = MasterTable(MASTER_CSV, DEDUPE_COLS)
+    new_rows = master.append(scraped_df)
+    print(f" Master file updated: {master.rows} total rows")
+    print(f" Appended {new_rows} new row(s)")
+
+
+def run(session):
+    print(" Navigating to recent pitcher game logs...")
+    save(scrape(session))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Scrape Stathead pitcher game logs into the master CSV.")
+    arg_parser.add_argument("--replay", metavar="DATE", help="re-parse pages cached on DATE (YYYY-MM-DD) offline")
+    args = arg_parser.parse_args()
+
+    if args.replay:
+        save(replay(args.replay), day=args.replay)
     else:
-        scraped_df.to_csv(master_csv, index=False)
-        print(" Master file created.")
-else:
-    print(" No data collected.")
+        with open_session() as session:
+            run(session)
@@ -0,0 +1,151 @@
+import os
+import re
+import sys
+import glob
+import gzip
+import hashlib
+import threading
+import argparse
+import datetime
+import pandas as pd
+
+ARCHIVE_DIR = "data/archive"
+MANIFEST_COLS = ["source", "day", "timestamp", "sha256", "size"]
+
+# Legacy layout: data/archive/<day>/<source>_<YYYYMMDD>_<HHMMSS>.csv
+LEGACY_NAME = re.compile(r"^(?P<source>.+)_(?P<timestamp>\d{8}_\d{6})\.csv$")
+
+# The parallel scrape archives from several threads; one writer at a time keeps
+# the manifest to a single header and the blob temp files unshared
+_write_lock = threading.Lock()
+
+
+def _blob_path(digest, archive_dir=ARCHIVE_DIR):
+    return os.path.join(archive_dir, "blobs", digest[:2], f"{digest}.csv.gz")
+
+
+def _manifest_path(archive_dir=ARCHIVE_DIR):
+    return os.path.join(archive_dir, "manifest.csv")
+
+
+# === Writes
+def put_bytes(source, data, day=None, timestamp=None, archive_dir=ARCHIVE_DIR):
+    """Record one snapshot of ``source``; identical content is stored once.
+
+    The CSV bytes are kept gzip-compressed under their SHA-256, and a
+    (source, day, timestamp) → blob line is appended to the manifest.
+    Safe to call from several threads at once.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest, archive_dir)
+
+    now = datetime.datetime.now()
+    entry = {
+        "source": source,
+        "day": day or now.date().isoformat(),
+        "timestamp": timestamp or now.strftime("%Y%m%d_%H%M%S"),
+        "sha256": digest,
+        "size": len(data),
+    }
+    manifest = _manifest_path(archive_dir)
+    with _write_lock:
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp"
+            # mtime=0 keeps the compressed blob itself reproducible
+            with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9, mtime=0) as f:
+                f.write(data)
+            os.replace(tmp, path)
+        pd.DataFrame([entry], columns=MANIFEST_COLS).to_csv(
+            manifest, mode="a", header=not os.path.exists(manifest), index=False
+        )
+    return entry
+
+
+def put_frame(source, df, day=None, timestamp=None, archive_dir=ARCHIVE_DIR):
+    return put_bytes(source, df.to_csv(index=False).encode("utf-8"), day, timestamp, archive_dir)
+
+
+def put_file(source, path, day=None, timestamp=None, archive_dir=ARCHIVE_DIR):
+    with open(path, "rb") as f:
+        return put_bytes(source, f.read(), day, timestamp, archive_dir)
+
+
+# === Reads
+def snapshots(source=None, day=None, archive_dir=ARCHIVE_DIR):
+    """Manifest rows, oldest first, optionally filtered by source and day."""
+    manifest = _manifest_path(archive_dir)
+    if not os.path.exists(manifest):
+        return pd.DataFrame(columns=MANIFEST_COLS)
+    entries = pd.read_csv(manifest, dtype=str)
+    if source is not None:
+        entries = entries[entries["source"] == source]
+    if day is not None:
+        entries = entries[entries["day"] == day]
+    return entries.sort_values(["day", "timestamp"], kind="stable").reset_index(drop=True)
+
+
+def read_snapshot(digest, archive_dir=ARCHIVE_DIR, **read_csv_kwargs):
+    return pd.read_csv(_blob_path(digest, archive_dir), compression="gzip", **read_csv_kwargs)
+
+
+def iter_snapshots(source, day=None, archive_dir=ARCHIVE_DIR, **read_csv_kwargs):
+    """Yield ``(entry, DataFrame)`` for every snapshot of ``source``, oldest first."""
+    for entry in snapshots(source, day, archive_dir).to_dict("records"):
+        yield entry, read_snapshot(entry["sha256"], archive_dir, **read_csv_kwargs)
+
+
+def latest_snapshot(source, day=None, archive_dir=ARCHIVE_DIR, **read_csv_kwargs):
+    entries = snapshots(source, day, archive_dir)
+    if entries.empty:
+        return None
+    return read_snapshot(entries["sha256"].iloc[-1], archive_dir, **read_csv_kwargs)
+
+
+# === Migration of the old per-day CSV folders
+def import_legacy(archive_dir=ARCHIVE_DIR, prune=False):
+    """Move every data/archive/<day>/*.csv into the store; returns (files, new blobs)."""
+    known = set(snapshots(archive_dir=archive_dir)[["source", "timestamp", "sha256"]].itertuples(index=False, name=None))
+    files = sorted(glob.glob(os.path.join(archive_dir, "????-??-??", "*.csv")))
+    imported, blobs_before = 0, len(glob.glob(os.path.join(archive_dir, "blobs", "*", "*.csv.gz")))
+    for path in files:
+        match = LEGACY_NAME.match(os.path.basename(path))
+        if not match:
+            print(f" Skipping {path}: no <source>_<timestamp>.csv name")
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        source, timestamp = match["source"], match["timestamp"]
+        if (source, timestamp, hashlib.sha256(data).hexdigest()) not in known:
+            day = os.path.basename(os.path.dirname(path))
+            put_bytes(source, data, day=day, timestamp=timestamp, archive_dir=archive_dir)
+        imported += 1
+        if prune:
+            os.remove(path)
+    if prune:
+        for day_dir in glob.glob(os.path.join(archive_dir, "????-??-??")):
+            if not os.listdir(day_dir):
+                os.rmdir(day_dir)
+    blobs_after = len(glob.glob(os.path.join(archive_dir, "blobs", "*", "*.csv.gz")))
+    return imported, blobs_after - blobs_before
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Deduplicated, compressed store for archive snapshots.")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser("import", help="move legacy data/archive/<day>/*.csv files into the store")
+    import_cmd.add_argument("--prune", action="store_true", help="delete the CSVs once they are stored")
+    list_cmd = commands.add_parser("list", help="list stored snapshots")
+    list_cmd.add_argument("--source")
+    list_cmd.add_argument("--day")
+    args = arg_parser.parse_args()
+
+    if args.command == "import":
+        files, blobs = import_legacy(prune=args.prune)
+        print(f" Imported {files} snapshot file(s) into {blobs} new blob(s)")
+    else:
+        entries = snapshots(args.source, args.day)
+        if entries.empty:
+            print(" No snapshots stored.")
+            sys.exit(0)
+        print(entries.to_string(index=False))
@@ -0,0 +1,145 @@
+import io
+import os
+import sys
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+INDEX_DIR = "data/index"
+
+
+# === Dedupe keys, compared as they are written to CSV
+def key_frame(df, cols):
+    return pd.read_csv(io.StringIO(df[cols].to_csv(index=False)), dtype=str, keep_default_na=False)
+
+
+def hash_keys(df, cols):
+    """64-bit hash per row of the CSV-serialised dedupe key columns."""
+    keys = key_frame(df, cols)
+    joined = keys.agg("\x1f".join, axis=1) if len(keys) else pd.Series([], dtype=str)
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(k.encode(), digest_size=8).digest(), "little") for k in joined],
+        dtype=np.uint64,
+    )
+
+
+class MasterTable:
+    """Append-only master CSV with a persistent hash index of its dedupe keys.
+
+    New rows are checked against the index and only unseen ones are appended,
+    so a merge costs O(new rows). The index lives in data/index/ next to a
+    small JSON sidecar; if the CSV was changed by something else (its size no
+    longer matches) the index is rebuilt from the key columns. ``compact()``
+    rewrites the CSV without duplicates.
+    """
+
+    def __init__(self, path, key_cols, index_dir=INDEX_DIR):
+        self.path = path
+        self.key_cols = list(key_cols)
+        name = os.path.basename(path)
+        self.index_path = os.path.join(index_dir, f"{name}.keys")
+        self.meta_path = os.path.join(index_dir, f"{name}.json")
+        self._keys = None
+        self._meta = None
+
+    # === Index state
+    def _load(self):
+        if self._keys is not None:
+            return
+        meta = None
+        if os.path.exists(self.meta_path) and os.path.exists(self.index_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if meta and meta.get("size") == size and meta.get("key_cols") == self.key_cols:
+            self._keys = set(np.fromfile(self.index_path, dtype=np.uint64).tolist())
+            self._meta = meta
+        else:
+            self._rebuild()
+
+    def _rebuild(self):
+        if os.path.exists(self.path):
+            print(f" Building key index for {self.path}...")
+            keys = pd.read_csv(self.path, usecols=self.key_cols, dtype=str)
+            hashes = hash_keys(keys, self.key_cols)
+            columns = list(pd.read_csv(self.path, nrows=0).columns)
+        else:
+            hashes, columns = np.array([], dtype=np.uint64), []
+        self._keys = set(hashes.tolist())
+        self._meta = {"key_cols": self.key_cols, "columns": columns, "rows": int(len(hashes)), "size": 0}
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        np.array(sorted(self._keys), dtype=np.uint64).tofile(self.index_path)
+        self._save_meta()
+
+    def _save_meta(self):
+        self._meta["size"] = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        with open(self.meta_path, "w") as f:
+            json.dump(self._meta, f)
+
+    @property
+    def rows(self):
+        self._load()
+        return self._meta["rows"]
+
+    # === Queries
+    def is_known(self, df):
+        """True when every row of ``df`` is already in the master."""
+        self._load()
+        if df.empty or not self._keys:
+            return False
+        return all(h in self._keys for h in hash_keys(df, self.key_cols).tolist())
+
+    # === Writes
+    def append(self, df):
+        """Append rows whose keys are not in the master yet; returns how many were added."""
+        self._load()
+        hashes = hash_keys(df, self.key_cols)
+        fresh = ~pd.Series(hashes).duplicated().to_numpy()
+        fresh &= np.array([h not in self._keys for h in hashes.tolist()], dtype=bool)
+        new_df, new_hashes = df[fresh], hashes[fresh]
+        if new_df.empty:
+            return 0
+
+        columns = self._meta["columns"]
+        if not columns:
+            new_df.to_csv(self.path, index=False)
+            self._meta["columns"] = list(new_df.columns)
+        elif set(new_df.columns) - set(columns):
+            # Schema grew: fall back to a full rewrite with the union of columns
+            combined = pd.concat([pd.read_csv(self.path), new_df], ignore_index=True)
+            combined.to_csv(self.path, index=False)
+            self._meta["columns"] = list(combined.columns)
+        else:
+            new_df.reindex(columns=columns).to_csv(self.path, mode="a", header=False, index=False)
+
+        with open(self.index_path, "ab") as f:
+            f.write(new_hashes.tobytes())
+        self._keys.update(new_hashes.tolist())
+        self._meta["rows"] += int(len(new_df))
+        self._save_meta()
+        return int(len(new_df))
+
+    def compact(self):
+        """Rewrite the master without duplicate keys and rebuild the index."""
+        if not os.path.exists(self.path):
+            return 0
+        df = pd.read_csv(self.path)
+        before = len(df)
+        df = df[~pd.Series(hash_keys(df, self.key_cols)).duplicated().to_numpy()]
+        df.to_csv(self.path, index=False)
+        self._keys = None
+        self._rebuild()
+        return before - len(df)
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from scrape_logic import ScrapePitcherGameData, ScrapeTeamBatting, ScrapeTeamPitching
+
+    # Compaction is the only full rewrite; run it occasionally, not every scrape
+    for finder in [ScrapePitcherGameData, ScrapeTeamBatting, ScrapeTeamPitching]:
+        master = MasterTable(finder.MASTER_CSV, finder.DEDUPE_COLS)
+        removed = master.compact()
+        print(f" Compacted {finder.MASTER_CSV}: removed {removed} duplicate row(s), {master.rows} rows kept")
@@ -0,0 +1,11 @@
+# Where each Stathead master lives and the columns that identify one of its rows.
+# Kept free of imports so readers of the masters (ingest, the app) need none of the scraping stack.
+
+PITCHER_MASTER_CSV = "data/Stathead_2025_Pitcher_Master.csv"
+PITCHER_DEDUPE_COLS = ["Player", "Date", "Team", "IP", "Result"]
+
+TEAM_BATTING_MASTER_CSV = "data/Stathead_2025_TeamBatting_Master.csv"
+TEAM_BATTING_DEDUPE_COLS = ["Team", "Date", "Result", "R"]
+
+TEAM_PITCHING_MASTER_CSV = "data/Stathead_2025_TeamPitching_Master.csv"
+TEAM_PITCHING_DEDUPE_COLS = ["Team", "Date", "Result", "IP"]
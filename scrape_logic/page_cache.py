@@ -0,0 +1,83 @@
+import os
+import gzip
+import json
+import hashlib
+import datetime
+
+CACHE_DIR = "data/page_cache"
+
+# One id per scrape process, so pages from the same run replay together
+RUN_ID = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def _object_path(digest):
+    return os.path.join(CACHE_DIR, "objects", digest[:2], f"{digest}.html.gz")
+
+
+def _manifest_path(day):
+    return os.path.join(CACHE_DIR, day, "manifest.jsonl")
+
+
+# === Writes
+def store(source, html, page=None, url=None, day=None):
+    """Save a fetched page under its SHA-256 and log it in the day's manifest.
+
+    Identical pages (e.g. the same result page fetched by three runs a day)
+    share one gzip object; only the manifest line is repeated.
+    """
+    data = html.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = _object_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    day = day or datetime.date.today().isoformat()
+    os.makedirs(os.path.dirname(_manifest_path(day)), exist_ok=True)
+    entry = {
+        "source": source,
+        "run": RUN_ID,
+        "page": page,
+        "url": url,
+        "sha256": digest,
+        "fetched_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(_manifest_path(day), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+    return digest
+
+
+def recording(source, pages, url=None):
+    """Pass pages through unchanged while storing each one in the cache."""
+    try:
+        for page_num, html in enumerate(pages, start=1):
+            store(source, html, page=page_num, url=url)
+            yield html
+    finally:
+        if hasattr(pages, "close"):
+            pages.close()
+
+
+# === Reads
+def load(digest):
+    with gzip.open(_object_path(digest), "rb") as f:
+        return f.read().decode("utf-8")
+
+
+def entries(source, day):
+    path = _manifest_path(day)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    rows = [r for r in rows if r["source"] == source]
+    return sorted(rows, key=lambda r: (r["run"], r["page"] or 0))
+
+
+def iter_pages(source, day):
+    """Yield every cached page of ``source`` fetched on ``day``, run by run."""
+    for entry in entries(source, day):
+        yield load(entry["sha256"])
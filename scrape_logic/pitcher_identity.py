@@ -0,0 +1,182 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import difflib
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrape_logic import masters
+from pipeline_logic.ingest import player_key
+
+ID_MAP_CSV = "data/pitcher_id_map.csv"
+NAME_MAP_CSV = "data/pitcher_name_map.csv"
+PITCHER_MASTER_CSV = masters.PITCHER_MASTER_CSV
+INDEX_PATH = "data/index/pitcher_identity.json"
+
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+ABBREVIATED = re.compile(r"^[A-Za-z]\.\s*\S")
+FUZZY_CUTOFF = 0.9
+
+
+# === Name keys
+def name_tokens(name):
+    """Tokens of a name's ``player_key``, without punctuation or Jr./III suffixes."""
+    text = player_key(name).replace(".", " ").replace("-", " ").replace("'", "")
+    tokens = re.sub(r"[^a-z ]", " ", text).split()
+    while len(tokens) > 1 and tokens[-1] in SUFFIXES:
+        tokens.pop()
+    return tokens
+
+
+def full_key(name):
+    """``"José Buttó Jr."`` → ``"josebutto"``."""
+    return "".join(name_tokens(name))
+
+
+def abbr_key(name):
+    """``"J. Buttó"`` or ``"José Buttó"`` → ``"j|butto"`` (first initial, last name)."""
+    tokens = name_tokens(name)
+    if len(tokens) < 2:
+        return None
+    return f"{tokens[0][0]}|{tokens[-1]}"
+
+
+def split_camel(name):
+    """``"MarkLeiterJr."`` → ``"Mark Leiter Jr."`` (pitcher_id_map stores names without spaces)."""
+    return re.sub(r"(?<=[a-z.])(?=[A-Z])", " ", str(name))
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _inputs_signature(paths):
+    # Content hashes: a same-size edit (a corrected spelling) must still rebuild the index
+    return {p: _file_digest(p) if os.path.exists(p) else None for p in paths}
+
+
+class PitcherIdentityIndex:
+    """Name → PlayerID lookups compiled from the ID map, the abbreviation map
+    and the Stathead pitcher master.
+
+    Lookups try the normalized full name, then (for ``"F. Last"`` names) the
+    initial + last-name key, then a fuzzy match among full names that start
+    with the same letter. The compiled dictionaries are saved to
+    data/index/pitcher_identity.json and rebuilt when the content of an input file changes.
+    """
+
+    def __init__(self, full, abbr, names, sources=None):
+        self.full = full
+        self.abbr = abbr
+        self.names = names
+        self.sources = sources or {}
+        self._blocks = {}
+        for key in full:
+            self._blocks.setdefault(key[:1], []).append(key)
+
+    # === Build / persist
+    @classmethod
+    def build(cls, id_map_csv=ID_MAP_CSV, name_map_csv=NAME_MAP_CSV, master_csv=PITCHER_MASTER_CSV):
+        full, names, abbr_ids = {}, {}, {}
+        id_map = pd.read_csv(id_map_csv, dtype=str).dropna(subset=["PlayerID"])
+        for row in id_map.itertuples(index=False):
+            pid = int(row.PlayerID)
+            for name in [split_camel(row.FullName), row.CleanName]:
+                if isinstance(name, str) and full_key(name):
+                    full.setdefault(full_key(name), pid)
+            if isinstance(row.Pitcher, str) and abbr_key(row.Pitcher):
+                abbr_ids.setdefault(abbr_key(row.Pitcher), set()).add(pid)
+            names.setdefault(pid, split_camel(row.FullName) if isinstance(row.FullName, str) else row.Pitcher)
+
+        index = cls(full, {}, names)
+
+        # Stathead spellings (accents, middle initials) become aliases and the display name
+        if os.path.exists(master_csv):
+            players = pd.read_csv(master_csv, usecols=["Player"], dtype=str)["Player"].dropna().unique()
+            for player in players:
+                pid = index._match_full(full_key(player))
+                if pid is not None:
+                    full.setdefault(full_key(player), pid)
+                    names[pid] = player
+
+        for pid, name in names.items():
+            if abbr_key(name):
+                abbr_ids.setdefault(abbr_key(name), set()).add(pid)
+
+        # Explicit abbreviation expansions settle initials shared by two pitchers
+        abbr = {key: next(iter(ids)) for key, ids in abbr_ids.items() if len(ids) == 1}
+        if os.path.exists(name_map_csv):
+            name_map = pd.read_csv(name_map_csv, dtype=str).dropna()
+            for row in name_map.itertuples(index=False):
+                pid = full.get(full_key(row.FullName))
+                if pid is not None and abbr_key(row.AbbrName):
+                    abbr[abbr_key(row.AbbrName)] = pid
+
+        sources = _inputs_signature([id_map_csv, name_map_csv, master_csv])
+        return cls(full, abbr, names, sources)
+
+    def save(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = {
+            "sources": self.sources,
+            "full": self.full,
+            "abbr": self.abbr,
+            "names": {str(pid): name for pid, name in self.names.items()},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH, id_map_csv=ID_MAP_CSV, name_map_csv=NAME_MAP_CSV,
+             master_csv=PITCHER_MASTER_CSV):
+        """Load the saved index, rebuilding it first if any input has changed."""
+        sources = _inputs_signature([id_map_csv, name_map_csv, master_csv])
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("sources") == sources:
+                names = {int(pid): name for pid, name in payload["names"].items()}
+                return cls(payload["full"], payload["abbr"], names, sources)
+        print(" Building pitcher identity index...")
+        index = cls.build(id_map_csv, name_map_csv, master_csv)
+        index.save(path)
+        return index
+
+    # === Lookups
+    def _match_full(self, key):
+        if not key:
+            return None
+        if key in self.full:
+            return self.full[key]
+        close = difflib.get_close_matches(key, self._blocks.get(key[:1], []), n=1, cutoff=FUZZY_CUTOFF)
+        return self.full[close[0]] if close else None
+
+    def lookup(self, name):
+        """PlayerID for a schedule or Stathead name, or ``None`` when unknown."""
+        if not isinstance(name, str) or not name.strip():
+            return None
+        key = full_key(name)
+        if key in self.full:
+            return self.full[key]
+        if ABBREVIATED.match(name.strip()):
+            return self.abbr.get(abbr_key(name))
+        return self._match_full(key)
+
+    def display_name(self, pid):
+        return self.names.get(pid)
+
+    def attach_ids(self, df, name_col, id_col):
+        """Add a nullable integer ``id_col`` resolved from ``name_col``; returns the unmatched names."""
+        lookups = {name: self.lookup(name) for name in df[name_col].dropna().unique()}
+        df[id_col] = df[name_col].map(lookups).astype("Int64")
+        return sorted(name for name, pid in lookups.items() if pid is None)
+
+
+if __name__ == "__main__":
+    index = PitcherIdentityIndex.build()
+    index.save()
+    print(f" Saved {INDEX_PATH}: {len(index.names)} pitchers, {len(index.full)} name keys, {len(index.abbr)} abbreviations")
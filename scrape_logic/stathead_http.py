@@ -0,0 +1,150 @@
+import os
+import re
+from urllib.parse import urljoin, urlsplit, urlunsplit
+import requests
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+
+from scrape_logic.stathead_session import StatheadSession, load_credentials
+
+# Point at a local stub server (utilities/stathead_stub_server.py) to scrape offline
+BASE_URL = os.getenv("STATHEAD_BASE_URL", "https://stathead.com")
+LOGIN_PATH = "/users/login.cgi"
+NEXT_XPATH = (
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' prevnext ')]"
+    "//a[contains(concat(' ', normalize-space(@class), ' '), ' button2 ')"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' next ')]/@href"
+)
+NO_RESULTS = re.compile(r"returned no results|no results found", re.IGNORECASE)
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/136.0 Safari/537.36"
+)
+
+
+class LoginError(RuntimeError):
+    pass
+
+
+def next_page_url(page_html, page_url):
+    hrefs = lxml_html.fromstring(page_html).xpath(NEXT_XPATH)
+    return urljoin(page_url, hrefs[0]) if hrefs else None
+
+
+class StatheadHTTPSession:
+    """Browserless Stathead client with the same interface as StatheadSession.
+
+    Logs in once with a form POST and keeps one pooled keep-alive
+    ``requests.Session`` for every finder page. If a result page comes back
+    without a stats table (e.g. the site starts rendering it client-side),
+    the query is retried through a Selenium session seeded with our cookies.
+    """
+
+    def __init__(self, base_url=BASE_URL, timeout=60, pool_size=8, selenium_fallback=True):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.selenium_fallback = selenium_fallback
+        self.http = None
+        self._fallback = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        if self.http is not None:
+            return self
+        username, password = load_credentials()
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=2)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self.http.headers["User-Agent"] = USER_AGENT
+
+        print(f" Logging in to {self.base_url} over HTTP...")
+        login_url = self.base_url + LOGIN_PATH
+        page = self.http.get(login_url, timeout=self.timeout)
+        page.raise_for_status()
+        forms = lxml_html.fromstring(page.text, base_url=page.url).xpath("//form[.//input[@name='password']]")
+        if not forms:
+            raise LoginError(" Login form not found.")
+        form = forms[0]
+        payload = dict(form.form_values())
+        payload["username"] = username
+        payload["password"] = password
+
+        resp = self.http.post(urljoin(page.url, form.action or login_url), data=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        if urlsplit(resp.url).path == LOGIN_PATH or 'name="password"' in resp.text:
+            raise LoginError(" Stathead login was rejected.")
+        print(" Logged in.")
+        return self
+
+    @property
+    def cookies(self):
+        if self.http is None:
+            return []
+        return [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+            for c in self.http.cookies
+        ]
+
+    def _local(self, url):
+        # Finder URLs are written against stathead.com; re-home them on base_url
+        parts = urlsplit(url)
+        base = urlsplit(self.base_url)
+        return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, ""))
+
+    def iter_pages(self, url):
+        """Yield the HTML of every result page of a finder query."""
+        self.open()
+        url = self._local(url)
+        first = True
+        while url:
+            resp = self.http.get(url, timeout=self.timeout)
+            resp.raise_for_status()
+            if "stats_table" not in resp.text:
+                if NO_RESULTS.search(resp.text):
+                    print(" Search returned no results.")
+                elif first and self.selenium_fallback:
+                    print(" No stats table over HTTP — falling back to Selenium.")
+                    yield from self._selenium().iter_pages(url)
+                else:
+                    print(" Table not found on page.")
+                return
+            first = False
+
+            yield resp.text
+
+            url = next_page_url(resp.text, resp.url)
+            if url:
+                print(" Moving to next page...")
+            else:
+                print(" No more pages to scrape.")
+
+    def _selenium(self):
+        if self._fallback is None:
+            self._fallback = StatheadSession(cookies=self.cookies)
+        return self._fallback
+
+    def close(self):
+        if self._fallback is not None:
+            self._fallback.close()
+            self._fallback = None
+        if self.http is not None:
+            self.http.close()
+            self.http = None
+
+
+def open_session(backend="http", **kwargs):
+    """Return an opened Stathead session, preferring the HTTP backend."""
+    if backend == "http":
+        try:
+            return StatheadHTTPSession(**kwargs).open()
+        except (LoginError, requests.RequestException) as e:
+            print(f" HTTP backend unavailable ({e}) — using Selenium.")
+    return StatheadSession().open()
@@ -0,0 +1,126 @@
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from webdriver_manager.chrome import ChromeDriverManager
+
+HOME_URL = "https://stathead.com/"
+LOGIN_URL = "https://stathead.com/users/login.cgi"
+TABLE_SELECTOR = "table.stats_table"
+NEXT_SELECTOR = "div.prevnext a.button2.next"
+
+
+# === Credentials
+def load_credentials():
+    load_dotenv(dotenv_path=Path("utilities/.env"))
+    username = os.getenv("STATHEAD_USERNAME")
+    password = os.getenv("STATHEAD_PASSWORD")
+    if not username or not password:
+        raise ValueError(" STATHEAD_USERNAME or STATHEAD_PASSWORD is not set.")
+    return username, password
+
+
+# === Headless browser
+def build_driver(page_load_timeout=240):
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
+
+class StatheadSession:
+    """Logged-in headless Chrome shared by the Stathead game-finder scrapers.
+
+    Chrome is started and the login form submitted once; every finder query
+    then reuses the same driver and its authenticated cookies. Passing the
+    ``cookies`` of an existing session opens another browser that skips the
+    login form, which is how parallel scrapes share a single login.
+    """
+
+    def __init__(self, table_wait=180, login_wait=30, cookies=None):
+        self.table_wait = table_wait
+        self.login_wait = login_wait
+        self.driver = None
+        self._cookies = cookies
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        if self.driver is not None:
+            return self
+        if self._cookies:
+            print(" Starting browser with shared Stathead login...")
+            self.driver = build_driver()
+            self.driver.get(HOME_URL)
+            for cookie in self._cookies:
+                self.driver.add_cookie(cookie)
+            return self
+
+        username, password = load_credentials()
+        print(" Starting browser and logging in to Stathead...")
+        self.driver = build_driver()
+        self.driver.get(LOGIN_URL)
+        WebDriverWait(self.driver, self.login_wait).until(
+            EC.presence_of_element_located((By.NAME, "username"))
+        )
+        self.driver.find_element(By.NAME, "username").send_keys(username)
+        self.driver.find_element(By.NAME, "password").send_keys(password)
+        self.driver.find_element(By.NAME, "password").send_keys(Keys.RETURN)
+        WebDriverWait(self.driver, self.login_wait).until(
+            lambda d: "login.cgi" not in d.current_url
+        )
+        print(" Logged in.")
+        return self
+
+    @property
+    def cookies(self):
+        return self.driver.get_cookies() if self.driver else []
+
+    def wait_for_table(self):
+        WebDriverWait(self.driver, self.table_wait).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, TABLE_SELECTOR))
+        )
+
+    def iter_pages(self, url):
+        """Yield the page source of every result page of a finder query."""
+        self.open()
+        self.driver.get(url)
+        while True:
+            try:
+                self.wait_for_table()
+            except TimeoutException:
+                print(" Table not found on page.")
+                return
+
+            yield self.driver.page_source
+
+            try:
+                href = self.driver.find_element(By.CSS_SELECTOR, NEXT_SELECTOR).get_attribute("href")
+            except NoSuchElementException:
+                href = None
+            if not href:
+                print(" No more pages to scrape.")
+                return
+            print(" Moving to next page...")
+            self.driver.get(href)
+
+    def close(self):
+        if self.driver is not None:
+            print("🧹 Shutting down browser...")
+            self.driver.quit()
+            self.driver = None
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+HEADER_ROW_CLASSES = {"thead", "over_header", "spacer"}
+
+
+class _TableTarget:
+    """lxml parser target that keeps only the cells of the first matching table.
+
+    No DOM is built: start/end/data events outside the table are ignored and
+    in-table header rows are recognised while the page streams through.
+    """
+
+    def __init__(self, table_class):
+        self.table_class = table_class
+        self.depth = 0
+        self.found = False
+        self.done = False
+        self.section = None
+        self.row = None
+        self.row_class = ""
+        self.cell = None
+        self.colspan = 1
+        self.header_rows = []
+        self.rows = []
+
+    def start(self, tag, attrib):
+        if self.done:
+            return
+        if tag == "table":
+            if self.depth:
+                self.depth += 1
+            elif self.table_class in attrib.get("class", "").split():
+                self.depth = 1
+                self.found = True
+            return
+        if self.depth != 1:
+            return
+        if tag in ("thead", "tbody", "tfoot"):
+            self.section = tag
+        elif tag == "tr":
+            self.row = []
+            self.row_class = attrib.get("class", "")
+        elif tag in ("td", "th") and self.row is not None:
+            self.cell = []
+            try:
+                self.colspan = max(int(attrib.get("colspan", 1)), 1)
+            except ValueError:
+                self.colspan = 1
+
+    def end(self, tag):
+        if self.done or not self.depth:
+            return
+        if tag == "table":
+            self.depth -= 1
+            self.done = self.depth == 0
+        elif self.depth != 1:
+            return
+        elif tag in ("td", "th") and self.cell is not None:
+            self.row.append("".join(self.cell).strip())
+            self.row.extend([""] * (self.colspan - 1))
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            if self.section == "thead":
+                self.header_rows.append(self.row)
+            elif not HEADER_ROW_CLASSES & set(self.row_class.split()):
+                self.rows.append(self.row)
+            self.row = None
+
+    def data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+
+    def close(self):
+        return self
+
+
+def read_table(page_html, table_class="stats_table"):
+    """Return ``(header, rows)`` cell text for the first ``table.<table_class>``.
+
+    ``header`` is the last ``<thead>`` row (``None`` when there is no thead)
+    and ``rows`` excludes header rows repeated inside the body. Returns
+    ``None`` when the page has no such table.
+    """
+    target = _TableTarget(table_class)
+    parser = etree.HTMLParser(target=target)
+    parser.feed(page_html)
+    parser.close()
+    if not target.found:
+        return None
+    header = target.header_rows[-1] if target.header_rows else None
+    rows = target.rows
+    if header:
+        rows = [r for r in rows if not r or r[0] != header[0]]
+    return header, rows
+
+
+def column_names(header):
+    # Blank and repeated headers are named the way pd.read_html names them,
+    # so the master CSV schema (e.g. "Unnamed: 5" for the @ column) is kept
+    names, seen = [], {}
+    for i, label in enumerate(header):
+        name = label if label else f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def frame_from_rows(header, rows, normalize_dates=False):
+    """Build a typed DataFrame from cell text rows.
+
+    Columns whose every non-empty value is numeric become int/float columns;
+    everything else stays text. With ``normalize_dates`` the doubleheader
+    suffix is dropped from ``Date`` (``"2025-06-04 (2)"`` → ``"2025-06-04"``).
+    """
+    width = max([len(header)] + [len(r) for r in rows]) if header else max((len(r) for r in rows), default=0)
+    header = list(header or []) + [""] * (width - len(header or []))
+    rows = [r + [""] * (width - len(r)) if len(r) < width else r for r in rows]
+
+    df = pd.DataFrame(rows, columns=column_names(header))
+    df = df.replace("", np.nan)
+    for col in df.columns:
+        values = df[col]
+        present = values.notna().sum()
+        if not present:
+            continue
+        numeric = pd.to_numeric(values, errors="coerce")
+        if numeric.notna().sum() == present:
+            df[col] = numeric
+
+    if normalize_dates and "Date" in df.columns:
+        df["Date"] = df["Date"].astype(str).str.extract(r"(\d{4}-\d{2}-\d{2})")[0]
+    return df
+
+
+def parse_stats_table(page_html, table_class="stats_table", normalize_dates=False):
+    """Parse a Stathead result table straight into a typed DataFrame (``None`` if absent)."""
+    table = read_table(page_html, table_class)
+    if table is None:
+        return None
+    header, rows = table
+    return frame_from_rows(header, rows, normalize_dates=normalize_dates)
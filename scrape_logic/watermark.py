@@ -0,0 +1,28 @@
+import os
+import datetime
+import pandas as pd
+
+DEFAULT_DAYS = 5
+
+
+# === Latest game date already in a master file
+def latest_master_date(master_csv):
+    if not os.path.exists(master_csv):
+        return None
+    dates = pd.read_csv(master_csv, usecols=["Date"], dtype=str)["Date"]
+    dates = pd.to_datetime(dates.str.extract(r"^(\d{4}-\d{2}-\d{2})")[0], errors="coerce")
+    latest = dates.max()
+    return None if pd.isna(latest) else latest.date()
+
+
+def days_to_fetch(master_csv, default_days=DEFAULT_DAYS, today=None):
+    """Size of the ``previous_days`` window needed to catch up the master.
+
+    The latest day already stored is fetched again, since a run can land
+    before that day's late games are final.
+    """
+    latest = latest_master_date(master_csv)
+    if latest is None:
+        return default_days
+    today = today or datetime.date.today()
+    return max((today - latest).days + 1, 1)
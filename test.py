@@ -1,15 +1,20 @@
+import sys
 import pandas as pd
-import glob
+from pathlib import Path
 
-archive_files = glob.glob("data/archive/*/stathead_pitching_scrape_*.csv")
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from scrape_logic import archive_store
+
+snapshots = archive_store.snapshots("stathead_pitching_scrape")
 all_dfs = []
 
-for f in archive_files:
-    df = pd.read_csv(f)
+# Snapshots with identical content share a blob, so each one is read once
+for digest in snapshots["sha256"].unique():
+    df = archive_store.read_snapshot(digest)
     all_dfs.append(df)
 
 master = pd.concat(all_dfs, ignore_index=True)
 master.drop_duplicates(subset=["Player", "Date", "Team", "IP", "Result"], inplace=True)
 master.to_csv("data/Stathead_2025_Pitcher_Master.csv", index=False)
 
-print(f" Master rebuilt from {len(archive_files)} archive files: {len(master)} rows.")
+print(f" Master rebuilt from {len(snapshots)} archive snapshots: {len(master)} rows.")
@@ -0,0 +1,96 @@
+import sys
+import shutil
+import subprocess
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from pipeline_logic import feature_store
+
+DATA_FILES = [f.MASTER_CSV for f in feature_store.MASTERS] + ["data/team_name_map.csv"]
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    """A working directory holding copies of the masters, so the store is built in isolation."""
+    (tmp_path / "data").mkdir()
+    for name in DATA_FILES:
+        shutil.copy(ROOT / name, tmp_path / name)
+    monkeypatch.chdir(tmp_path)
+    feature_store._loaded.clear()
+    return tmp_path
+
+
+def _by_day(path):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return df, df["Date"].str[:10]
+
+
+def _assert_matches_full_build(parts):
+    """Rebuild from every part at once, then replay the parts incrementally and compare the tables."""
+    for path, chunks in parts.items():
+        pd.concat(chunks).to_csv(path, index=False)
+    full = {name: df.copy() for name, df in feature_store.materialize().items()}
+
+    for path, chunks in parts.items():
+        chunks[0].to_csv(path, index=False)
+    feature_store.materialize()
+    for step in range(1, max(len(c) for c in parts.values())):
+        for path, chunks in parts.items():
+            if step < len(chunks):
+                chunks[step].to_csv(path, mode="a", header=False, index=False)
+        feature_store.update()
+
+    for name in feature_store.TABLES:
+        pd.testing.assert_frame_equal(
+            pd.read_feather(feature_store._table_path(name)), full[name].reset_index(drop=True), check_exact=True
+        )
+
+
+def test_update_matches_full_build(store_dir):
+    parts = {}
+    for finder in feature_store.MASTERS:
+        df, day = _by_day(finder.MASTER_CSV)
+        days = sorted(day.unique())
+        parts[finder.MASTER_CSV] = [df[day.isin(days[:-4])], df[day.isin(days[-4:-2])], df[day.isin(days[-2:])]]
+    _assert_matches_full_build(parts)
+
+
+def test_update_matches_full_build_when_team_rows_arrive_late(store_dir):
+    # Pitcher rows of the last two days land one update before their team games
+    parts = {}
+    for finder in feature_store.MASTERS:
+        df, day = _by_day(finder.MASTER_CSV)
+        days = sorted(day.unique())
+        if finder.MASTER_CSV == feature_store.ScrapePitcherGameData.MASTER_CSV:
+            parts[finder.MASTER_CSV] = [df[day.isin(days[:-4])], df[day.isin(days[-4:])]]
+        else:
+            parts[finder.MASTER_CSV] = [df[day.isin(days[:-4])], df[day.isin(days[-4:-2])], df[day.isin(days[-2:])]]
+    _assert_matches_full_build(parts)
+
+
+def _build_dataset(*args):
+    script = ROOT / "pipeline_logic" / "build_team_runs_dataset.py"
+    subprocess.run([sys.executable, str(script), *args], check=True, capture_output=True)
+    return pd.read_csv("data/team_run_prediction_dataset.csv")
+
+
+def test_dataset_rebuilds_when_the_store_is_wiped(store_dir):
+    # The dataset state outlives data/features (cached separately in CI), whose generation counter restarts
+    masters = {}
+    for finder in feature_store.MASTERS:
+        df, day = _by_day(finder.MASTER_CSV)
+        last = day == max(day)
+        masters[finder.MASTER_CSV] = df[last]
+        df[~last].to_csv(finder.MASTER_CSV, index=False)
+    _build_dataset()
+
+    shutil.rmtree(feature_store.FEATURE_DIR)
+    for path, rows in masters.items():
+        rows.to_csv(path, mode="a", header=False, index=False)
+    incremental = _build_dataset()
+
+    pd.testing.assert_frame_equal(incremental, _build_dataset("--full"))
@@ -0,0 +1,66 @@
+# Micro-benchmark: BeautifulSoup + pd.read_html (the old per-page path) versus the
+# shared lxml stats_table parser, on Stathead-style pages rebuilt from archive snapshots.
+#
+#   python utilities/bench_stats_table.py --repeat 5
+import argparse
+import io
+import sys
+import time
+import warnings
+import pandas as pd
+from bs4 import BeautifulSoup
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrape_logic import archive_store
+from scrape_logic.stats_table import parse_stats_table
+from utilities.stathead_stub_server import PAGE_SIZE, render_page
+
+warnings.filterwarnings("ignore")
+
+
+# === Old path, as the scrapers used to parse each page
+def parse_with_read_html(html):
+    table = BeautifulSoup(html, "html.parser").select_one("table.stats_table")
+    df = pd.read_html(io.StringIO(str(table)))[0]
+    return df[df["Rk"].astype(str).str.lower() != "rk"].reset_index(drop=True)
+
+
+def load_pages(limit):
+    pages = []
+    for prefix in ["stathead_pitching_scrape", "stathead_team_batting_scrape", "stathead_team_pitching_scrape"]:
+        for digest in archive_store.snapshots(prefix)["sha256"].unique()[-limit:]:
+            df = archive_store.read_snapshot(digest, dtype=str)
+            pages += [render_page(df.iloc[i:i + PAGE_SIZE]) for i in range(0, len(df), PAGE_SIZE)]
+    return pages
+
+
+def bench(fn, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark Stathead table parsing.")
+    arg_parser.add_argument("--files", type=int, default=10, help="archive snapshots per source")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    pages = load_pages(args.files)
+    print(f" Loaded {len(pages)} pages from the archive store")
+
+    for html in pages:
+        old, new = parse_with_read_html(html), parse_stats_table(html)
+        if old.shape != new.shape or list(old.columns) != list(new.columns):
+            print(f" Shape mismatch: read_html {old.shape} vs lxml {new.shape}")
+
+    old_s = bench(parse_with_read_html, pages, args.repeat)
+    new_s = bench(parse_stats_table, pages, args.repeat)
+    print(f" BeautifulSoup + read_html: {old_s:.3f}s ({1000 * old_s / len(pages):.1f} ms/page)")
+    print(f" lxml stats_table:          {new_s:.3f}s ({1000 * new_s / len(pages):.1f} ms/page)")
+    print(f" Speedup: {old_s / new_s:.1f}x")
@@ -2,73 +2,142 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime, timedelta
 from dateutil import parser
+from lxml import html
 import pandas as pd
+import argparse
 import os
-import time
-import shutil
+import sys
+from pathlib import Path
 
-# === ChromeDriver path
-chrome_path = r"C:\Users\a1d3r\.wdm\drivers\chromedriver\win64\136.0.7103.94\chromedriver-win32\chromedriver.exe"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrape_logic import archive_store, page_cache
+from scrape_logic.pitcher_identity import PitcherIdentityIndex
+from scrape_logic.stats_table import frame_from_rows
 
-# === Headless Chrome setup
-options = Options()
-options.add_argument("--headless")
-options.add_argument("--disable-gpu")
-service = Service(executable_path=chrome_path)
+# === Command line: --replay DATE rebuilds the schedule from cached pages
+arg_parser = argparse.ArgumentParser(description="Scrape ESPN's MLB schedule and probable starters.")
+arg_parser.add_argument("--replay", metavar="DATE", help="re-parse ESPN pages cached on DATE (YYYY-MM-DD) offline")
+args = arg_parser.parse_args()
+
+CACHE_SOURCE = "espn_schedule"
 
 # === Get URLs for next 3 days
 base_url = "https://www.espn.com/mlb/schedule/_/date/"
 today = datetime.today()
 dates = [(today + timedelta(days=i)).strftime("%Y%m%d") for i in range(3)]
 
-all_games = []
+# Title and visible text of every row cell of the first schedule table,
+# read in one round-trip instead of one WebDriver call per cell
+SCHEDULE_SCRIPT = """
+const section = document.querySelector(".ScheduleTables");
+const title = section.querySelector(".Table__Title");
+return {
+    title: title ? title.innerText.trim() : "",
+    rows: Array.from(section.querySelectorAll("tbody tr.Table__TR")).map(
+        tr => Array.from(tr.querySelectorAll("td")).map(td => td.innerText.trim())
+    )
+};
+"""
+
+
+# === Live: one headless Chrome for every date, each rendered page cached
+def fetch_schedules():
+    # The window size is pinned so ESPN keeps its narrow layout (team abbreviations)
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=800,600")
+    service = Service(ChromeDriverManager().install())
 
-for date_str in dates:
     driver = webdriver.Chrome(service=service, options=options)
-    url = f"{base_url}{date_str}"
-    print(f" Loading → {url}")
-    driver.get(url)
-    time.sleep(5)
+    driver.set_page_load_timeout(60)
 
+    schedules = []
     try:
-        section = driver.find_element(By.CLASS_NAME, "ScheduleTables")
-        game_date = section.find_element(By.CLASS_NAME, "Table__Title").text.strip()
-        print(f" Game Date Found: {game_date}")
-
-        rows = section.find_elements(By.XPATH, ".//tbody/tr[contains(@class, 'Table__TR')]")
-        for row in rows:
-            cols = row.find_elements(By.TAG_NAME, "td")
-            if len(cols) < 5:
-                continue
+        for page_num, date_str in enumerate(dates, start=1):
+            url = f"{base_url}{date_str}"
+            print(f" Loading → {url}")
+
             try:
-                away_team = cols[0].text.strip()
-                home_team = cols[1].text.strip().replace("@", "").strip()
-                pitching_matchup = cols[4].text.strip()
-
-                if "vs" in pitching_matchup:
-                    away_pitcher, home_pitcher = [p.strip() for p in pitching_matchup.split("vs", 1)]
-                else:
-                    away_pitcher, home_pitcher = "Undecided", "Undecided"
-
-                all_games.append({
-                    "GameDate": game_date,
-                    "AwayTeam": away_team,
-                    "HomeTeam": home_team,
-                    "AwayPitcher": away_pitcher,
-                    "HomePitcher": home_pitcher
-                })
+                driver.get(url)
+                WebDriverWait(driver, 20).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ".ScheduleTables tbody tr.Table__TR"))
+                )
+                page_cache.store(CACHE_SOURCE, driver.page_source, page=page_num, url=url)
+                schedules.append(driver.execute_script(SCHEDULE_SCRIPT))
             except Exception as e:
-                print(f" Error processing row: {e}")
+                print(f" Could not find schedule on page {url} → {e}")
+    finally:
+        driver.quit()
+    return schedules
 
-    except Exception as e:
-        print(f" Could not find schedule on page {url} → {e}")
-    
-    driver.quit()
+
+# === Replay: the same title/rows read from cached markup with lxml
+def schedule_from_html(page_html):
+    root = html.fromstring(page_html)
+    sections = root.find_class("ScheduleTables")
+    if not sections:
+        return None
+    titles = sections[0].find_class("Table__Title")
+    return {
+        "title": titles[0].text_content().strip() if titles else "",
+        "rows": [
+            [td.text_content().strip() for td in tr.iter("td")]
+            for tr in sections[0].xpath(".//tbody/tr[contains(concat(' ', @class, ' '), ' Table__TR ')]")
+        ],
+    }
+
+
+def replay_schedules(day):
+    print(f" Replaying cached {CACHE_SOURCE} pages from {day}...")
+    schedules = []
+    for entry in page_cache.entries(CACHE_SOURCE, day):
+        schedule = schedule_from_html(page_cache.load(entry["sha256"]))
+        if schedule is None:
+            print(f" Could not find schedule in cached page {entry['url']}")
+            continue
+        schedules.append(schedule)
+    return schedules
+
+
+all_games = []
+
+schedules = replay_schedules(args.replay) if args.replay else fetch_schedules()
+for schedule in schedules:
+    game_date = schedule["title"]
+    print(f" Game Date Found: {game_date}")
+
+    rows = frame_from_rows(None, [r for r in schedule["rows"] if len(r) >= 5])
+    for cols in rows.itertuples(index=False):
+        try:
+            away_team = str(cols[0]).strip()
+            home_team = str(cols[1]).strip().replace("@", "").strip()
+            pitching_matchup = "" if pd.isna(cols[4]) else str(cols[4]).strip()
+
+            if "vs" in pitching_matchup:
+                away_pitcher, home_pitcher = [p.strip() for p in pitching_matchup.split("vs", 1)]
+            else:
+                away_pitcher, home_pitcher = "Undecided", "Undecided"
+
+            all_games.append({
+                "GameDate": game_date,
+                "AwayTeam": away_team,
+                "HomeTeam": home_team,
+                "AwayPitcher": away_pitcher,
+                "HomePitcher": home_pitcher
+            })
+        except Exception as e:
+            print(f" Error processing row: {e}")
 
 # === Create DataFrame
-df = pd.DataFrame(all_games)
+df = pd.DataFrame(all_games, columns=["GameDate", "AwayTeam", "HomeTeam", "AwayPitcher", "HomePitcher"])
 
 # === Drop games with both pitchers undecided
 df = df[~((df["AwayPitcher"] == "Undecided") & (df["HomePitcher"] == "Undecided"))]
@@ -93,42 +162,37 @@ df.rename(columns={
     "HomePitcher": "home_pitcher"
 }, inplace=True)
 
-# === Match pitcher IDs
+# === Match pitcher IDs (accent-insensitive, abbreviations expanded, fuzzy fallback)
 id_map_path = "data/pitcher_id_map.csv"
 if os.path.exists(id_map_path):
-    id_map = pd.read_csv(id_map_path)
-    id_map["FullName"] = id_map["FullName"].astype(str).str.replace(" ", "").str.strip()
-    full_name_to_id = dict(zip(id_map["FullName"], id_map["PlayerID"]))
-
-    def match_id(name):
-        key = name.replace(" ", "").strip()
-        return full_name_to_id.get(key, "")
-
-    df["away_pitcher_id"] = df["away_pitcher"].apply(match_id)
-    df["home_pitcher_id"] = df["home_pitcher"].apply(match_id)
+    identity = PitcherIdentityIndex.load()
+    unmatched = set()
+    for side in ["away", "home"]:
+        unmatched.update(identity.attach_ids(df, f"{side}_pitcher", f"{side}_pitcher_id"))
+    unmatched.discard("Undecided")
 
     print(" Successfully matched pitcher names to PlayerID.")
+    if unmatched:
+        print(f" No PlayerID for {len(unmatched)} pitcher(s): {', '.join(sorted(unmatched))}")
 else:
     print(" pitcher_id_map.csv not found.")
     df["away_pitcher_id"] = ""
     df["home_pitcher_id"] = ""
 
+# === Replayed schedules go to the archive store, not over the live file
+if args.replay:
+    snapshot = archive_store.put_frame("scheduled_games_and_starters_with_id_replay", df, day=args.replay)
+    print(f" Saved replayed schedule to archive snapshot {snapshot['sha256'][:12]} ({args.replay})")
+    sys.exit(0)
+
 # === Archive old file
 os.makedirs("data", exist_ok=True)
-os.makedirs("data/archive", exist_ok=True)
 
 output_path = "data/scheduled_games_and_starters_with_id.csv"
 if os.path.exists(output_path):
-    archive_date = datetime.now().strftime("%Y-%m-%d")
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    archive_dir = os.path.join("data", "archive", archive_date)
-    os.makedirs(archive_dir, exist_ok=True)
-
-    archive_filename = f"scheduled_games_and_starters_with_id_{timestamp}.csv"
-    archive_path = os.path.join(archive_dir, archive_filename)
-
-    shutil.move(output_path, archive_path)
-    print(f" Archived old file to {archive_path}")
+    snapshot = archive_store.put_file("scheduled_games_and_starters_with_id", output_path)
+    os.remove(output_path)
+    print(f" Archived old file as snapshot {snapshot['sha256'][:12]} ({snapshot['day']})")
 
 # === Save new schedule
 df.to_csv(output_path, index=False)
@@ -0,0 +1,148 @@
+# Local stand-in for stathead.com used to exercise the HTTP scrape backend offline.
+# Serves a login form plus paginated finder result pages, either from saved
+# HTML files or rendered from the CSV snapshots in the data/archive store:
+#
+#   python utilities/stathead_stub_server.py --archive-date 2025-06-21
+#   STATHEAD_BASE_URL=http://127.0.0.1:8765 python scrape_logic/ScrapeTeamBatting.py
+import argparse
+import glob
+import html
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit, urlencode
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from scrape_logic import archive_store
+
+PAGE_SIZE = 200
+HEADER_EVERY = 25
+SESSION_COOKIE = "sh_stub_session=ok"
+
+# Finder endpoint → archive snapshot source
+FINDER_SOURCES = {
+    "player-pitching-game-finder": "stathead_pitching_scrape",
+    "team-batting-game-finder": "stathead_team_batting_scrape",
+    "team-pitching-game-finder": "stathead_team_pitching_scrape",
+}
+
+LOGIN_FORM = """<html><body>
+<form method="post" action="/users/login.cgi">
+<input type="hidden" name="token" value="stub">
+<input name="username"><input name="password" type="password">
+</form></body></html>"""
+
+
+# === Stathead-style markup
+def render_stats_table(df):
+    """Render a DataFrame as a Stathead ``table.stats_table`` with repeated header rows."""
+    labels = ["" if str(c).startswith("Unnamed") else html.escape(str(c)) for c in df.columns]
+    header = "<tr>" + "".join(f"<th>{label}</th>" for label in labels) + "</tr>"
+    body = []
+    for i, row in enumerate(df.itertuples(index=False)):
+        if i and i % HEADER_EVERY == 0:
+            body.append(header.replace("<tr>", '<tr class="thead">', 1))
+        cells = ["" if pd.isna(v) else html.escape(str(v)) for v in row]
+        body.append("<tr><th>" + cells[0] + "</th>" + "".join(f"<td>{c}</td>" for c in cells[1:]) + "</tr>")
+    return (
+        '<table class="stats_table sortable">'
+        f"<thead>{header}</thead><tbody>{''.join(body)}</tbody></table>"
+    )
+
+
+def next_link(href):
+    return f'<div class="prevnext"><a class="button2 next" href="{html.escape(href)}">Next page</a></div>'
+
+
+def render_page(df, next_href=None):
+    nav = next_link(next_href) if next_href else ""
+    return f"<html><body>{render_stats_table(df)}{nav}</body></html>"
+
+
+def archive_pages(archive_date, finder):
+    source = FINDER_SOURCES.get(finder)
+    df = archive_store.latest_snapshot(source, archive_date, dtype=str) if source else None
+    if df is None:
+        return []
+    return [df.iloc[i:i + PAGE_SIZE] for i in range(0, len(df), PAGE_SIZE)]
+
+
+def saved_pages(pages_dir, finder):
+    return sorted(glob.glob(os.path.join(pages_dir, finder, "*.html")))
+
+
+# === Request handling
+def make_handler(pages_dir=None, archive_date=None):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status, body="", headers=None):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if urlsplit(self.path).path == "/users/login.cgi":
+                self._send(302, headers={"Location": "/", "Set-Cookie": f"{SESSION_COOKIE}; Path=/"})
+            else:
+                self._send(404)
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path == "/users/login.cgi":
+                return self._send(200, LOGIN_FORM)
+            if parts.path == "/":
+                return self._send(200, "<html><body>stub</body></html>")
+            if SESSION_COOKIE not in self.headers.get("Cookie", ""):
+                return self._send(302, headers={"Location": "/users/login.cgi"})
+
+            finder = os.path.basename(parts.path).removesuffix(".cgi")
+            query = parse_qs(parts.query)
+            page_index = int(query.get("offset", ["0"])[0]) // PAGE_SIZE
+
+            if pages_dir:
+                files = saved_pages(pages_dir, finder)
+                count = len(files)
+            else:
+                frames = archive_pages(archive_date, finder)
+                count = len(frames)
+            if page_index >= count:
+                return self._send(200, "<html><body>Your search returned no results.</body></html>")
+
+            next_href = None
+            if page_index + 1 < count:
+                query["offset"] = [str((page_index + 1) * PAGE_SIZE)]
+                next_href = f"{parts.path}?{urlencode(query, doseq=True)}"
+
+            if pages_dir:
+                with open(files[page_index], encoding="utf-8") as f:
+                    body = f.read()
+                if next_href and "prevnext" not in body:
+                    body += next_link(next_href)
+            else:
+                body = render_page(frames[page_index], next_href)
+            self._send(200, body)
+
+    return StubHandler
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Serve saved Stathead pages on localhost.")
+    source = arg_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pages-dir", help="directory with <finder>/*.html saved pages")
+    source.add_argument("--archive-date", help="render pages from that day's archive snapshots")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    args = arg_parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.pages_dir, args.archive_date))
+    print(f" Stathead stub listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()